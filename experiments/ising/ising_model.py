@@ -1,18 +1,27 @@
 
 from __future__ import annotations
 from typing import Iterable, Literal
-from itertools import product
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import os
 import json
 import jsonschema
-import math
 
 JSON_SCHEMA = json.loads(open(os.path.join(os.path.dirname(__file__),
 "schema.json"), "r").read())
 
+# Number of spin configurations that are evaluated at once when calculating the
+# partition function
+PARTITION_BLOCK_SIZE = 1 << 16
+# Models with more spins than this evaluate the blocks of configurations in the
+# partition function in parallel
+PARALLEL_SPIN_COUNT = 20
+
 class IsingModel:
     """ Classical Ising model with interaction and external field strengths """
 
+    __slots__ = ("_spin_count", "_interaction", "_external_field", "_packed")
+
     def __init__(self, spin_count: int, *, interaction: dict[tuple[int, int],
     float] | None = None, external_field: Iterable[float] | None = None):
         """ Constructor with number of spins. Optionally interactions and
@@ -25,9 +34,12 @@ class IsingModel:
             self._interaction = interaction.copy()
         # External field strength per node
         if external_field is None:
-            self._external_field = [0.0] * spin_count
+            self._external_field = np.zeros(spin_count, dtype=np.float64)
         else:
-            self._external_field = list(external_field)
+            self._external_field = np.fromiter(external_field,
+            dtype=np.float64)
+        # Interactions packed as arrays (i, j, strength), see _pack
+        self._packed: tuple[np.ndarray, np.ndarray, np.ndarray] | None = None
 
     def __len__(self) -> int:
         """ Returns the number of spins """
@@ -51,7 +63,8 @@ class IsingModel:
     def __repr__(self):
         """ Canonical representation """
         return (f"{self.__class__.__name__}({self._spin_count!r}, interaction="
-        f"{self._interaction!r}, external_field={self._external_field!r})")
+        f"{self._interaction!r}, external_field="
+        f"{self._external_field.tolist()!r})")
 
     def __str__(self) -> str:
         """ Convert this Ising model to JSON """
@@ -65,14 +78,15 @@ class IsingModel:
         model = cls(data["spin_count"])
         for i, j, strength in data["interaction"]:
             model.set_interaction(i, j, strength)
-        model._external_field = list(map(float, data["external_field"]))
+        model._external_field = np.asarray(data["external_field"],
+        dtype=np.float64)
         return model
 
     def to_string(self) -> str:
         """ Convert this Ising model to JSON """
         return json.dumps({
             "spin_count": self._spin_count,
-            "external_field": self._external_field,
+            "external_field": self._external_field.tolist(),
             "interaction": [(i, j, strength) for (i, j), strength in
             self._interaction.items()]
         })
@@ -94,10 +108,11 @@ class IsingModel:
         if add_to_existing:
             existing = self._interaction.get((i, j), 0.0)
         self._interaction[i, j] = existing + strength
+        self._packed = None
 
     def get_external_field(self, i: int) -> float:
         """ Get the external field strength at the given spin index """
-        return self._external_field[i]
+        return float(self._external_field[i])
     
     def set_external_field(self, i: int, strength: float, *, add_to_existing:
     bool = False):
@@ -112,23 +127,32 @@ class IsingModel:
     def hamiltonian(self, config: Iterable[Literal[-1, 1]]) -> float:
         """ Get the hamiltonian function of a specific configuration, which
             needs to have the same length as this object """
-        values = list(config)
-        assert len(values) == self._spin_count
-        total = 0.0
-        total -= sum(values[i] * values[j] * s for (i, j), s in
-        self._interaction.items())
-        total -= sum(v * s for v, s in zip(values, self._external_field))
-        return total
+        values = np.asarray(config, dtype=np.float64)
+        assert values.shape == (self._spin_count,)
+        first, second, strengths = self._pack()
+        return (-float(strengths @ (values[first] * values[second])) -
+        float(self._external_field @ values))
 
     def partition_function(self, beta: float = 1.0) -> float:
         """ Get the partition function value at inverse temperature beta """
-        total = 0.0
-        for config in product((-1, 1), repeat=self._spin_count):
-            total += math.exp(-beta * self.hamiltonian(config))
-        return total
+        n = self._spin_count
+        first, second, strengths = self._pack()
+        interaction = np.zeros((n, n))
+        np.add.at(interaction, (first, second), strengths)
+        # Enumerate all configurations in blocks. For larger models the blocks
+        # are evaluated in parallel threads, since NumPy releases the GIL
+        # during the heavy array operations
+        def block_sum(start: int) -> float:
+            return _partition_block(start, min(start + PARTITION_BLOCK_SIZE, 1
+            << n), interaction, self._external_field, beta)
+        starts = range(0, 1 << n, PARTITION_BLOCK_SIZE)
+        if n <= PARALLEL_SPIN_COUNT:
+            return float(sum(map(block_sum, starts)))
+        with ThreadPoolExecutor() as executor:
+            return float(sum(executor.map(block_sum, starts)))
 
     @property
-    def external_field(self) -> list[float]:
+    def external_field(self) -> np.ndarray:
         """ Access external field strengths """
         return self._external_field
 
@@ -136,4 +160,31 @@ class IsingModel:
         """ Get an iterator over all interactions in the model as tuples (i, j,
             strength) """
         for (i, j), strength in self._interaction.items():
-            yield (i, j, strength)
\ No newline at end of file
+            yield (i, j, strength)
+
+    def _pack(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """ Get the interactions as three parallel arrays with the first spin
+            indices, second spin indices, and strengths. The result is cached
+            until the interactions are changed """
+        if self._packed is None:
+            self._packed = (
+                np.fromiter((i for i, _ in self._interaction), dtype=np.int32,
+                count=len(self._interaction)),
+                np.fromiter((j for _, j in self._interaction), dtype=np.int32,
+                count=len(self._interaction)),
+                np.fromiter(self._interaction.values(), dtype=np.float64,
+                count=len(self._interaction)),
+            )
+        return self._packed
+
+def _partition_block(start: int, stop: int, interaction: np.ndarray,
+external_field: np.ndarray, beta: float) -> float:
+    """ Get the sum of e^(-beta*H) over the configurations with indices in the
+        range [start, stop), where bit i of the configuration index determines
+        the value of spin i """
+    shifts = np.arange(len(external_field), dtype=np.int64)
+    indices = np.arange(start, stop, dtype=np.int64)
+    configs = 1.0 - 2.0 * ((indices[:, None] >> shifts) & 1)
+    energies = -((configs @ interaction) * configs).sum(axis=1)
+    energies -= configs @ external_field
+    return float(np.exp(-beta * energies).sum())
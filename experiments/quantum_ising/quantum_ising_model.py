@@ -1,21 +1,21 @@
 
-from typing import Iterable, Literal, Any
-from functools import reduce
+from typing import Iterable, Any
 import numpy as np
-from scipy.linalg import expm
+import scipy.sparse as sp
+from scipy.sparse.linalg import expm_multiply
 import json
 import jsonschema
 import os
 
-X_MATRIX = np.matrix([[0, 1], [1, 0]])
-Z_MATRIX = np.matrix([[1, 0], [0, -1]])
-
 JSON_SCHEMA = json.loads(open(os.path.join(os.path.dirname(
 __file__), "schema.json"), "r").read())
 
 class QuantumIsingModel:
     """ Quantum Ising model interaction and external field strengths in two
         directions (uniform over all spins) """
+
+    __slots__ = ("_spin_count", "_interaction", "external_field_x",
+    "external_field_z")
     
     def __init__(self, spin_count: int, *, interaction: dict[tuple[int, int],
     float] | None = None, external_field_x: float = 0.0, external_field_z:
@@ -91,52 +91,74 @@ class QuantumIsingModel:
             existing = self._interaction.get((i, j), 0.0)
         self._interaction[i, j] = existing + strength
 
-    def partition_function(self, beta: float) -> float:
-        """ Returns the approximate partition function of the model, using
-            matrix exponentiation, given the inverse temperature beta. This
-            method is very slow for large models """
+    def partition_function(self, beta: float, *, probes: int | None = None,
+    seed: int | None = None) -> float:
+        """ Returns the partition function of the model given the inverse
+            temperature beta. By default this uses exact diagonalization of the
+            Hamiltonian, which is very slow for large models. If a number of
+            probes is given, the trace is instead estimated with Hutchinson's
+            estimator using random +-1 probe vectors, which only needs sparse
+            matrix-vector products. The seed is used for the probe vectors """
         # Partition function is Tr(e^(-beta*H))
-        return expm(-beta * self.hamiltonian()).trace()
-
-    def hamiltonian(self) -> np.matrix:
-        """ Determine the Hamiltonian matrix of this model. This method is very
-            slow for large models """
-        return -np.matrix(self._interaction_hamiltonian() +
-        self._external_field_hamiltonian("x") +
-        self._external_field_hamiltonian("z"))
-    
+        hamiltonian = self.hamiltonian()
+        if probes is None:
+            # Tr(e^(-beta*H)) = sum(e^(-beta*E)) over all eigenvalues E of H
+            energies = np.linalg.eigvalsh(hamiltonian.toarray())
+            return float(np.exp(-beta * energies).sum())
+        # Tr(A) ~ mean(v^T A v) over random vectors v with +-1 entries
+        rng = np.random.default_rng(seed)
+        vectors = rng.choice((-1.0, 1.0), size=(hamiltonian.shape[0], probes))
+        products = expm_multiply(-beta * hamiltonian, vectors)
+        return float((vectors * products).sum() / probes)
+
+    def hamiltonian(self) -> sp.csr_array:
+        """ Determine the (sparse) Hamiltonian matrix of this model. The
+            interaction and z-direction external field parts are diagonal in
+            the computational basis """
+        diagonal = (self._interaction_diagonal() +
+        self._external_field_diagonal())
+        return -(sp.diags_array(diagonal, format="csr") +
+        self._external_field_x_hamiltonian())
+
     def interactions(self) -> Iterable[tuple[int, int, float]]:
         """ Get an iterator over all interactions in the model as tuples (i, j,
             strength) """
         for (i, j), strength in self._interaction.items():
             yield (i, j, strength)
 
-    def _interaction_hamiltonian(self) -> np.matrix:
-        """ Get the interaction part of the Hamiltonian of this model """
-        current = np.zeros((2 ** self._spin_count, 2 ** self._spin_count))
-        # Lattice interactions
+    def _spin_signs(self, i: int) -> np.ndarray:
+        """ Get the eigenvalues of the Z operator on spin i for all basis
+            states. Spin 0 corresponds to the most significant bit of the basis
+            state index """
+        bits = np.arange(2 ** self._spin_count, dtype=np.int64)
+        return 1.0 - 2.0 * ((bits >> (self._spin_count - i - 1)) & 1)
+
+    def _interaction_diagonal(self) -> np.ndarray:
+        """ Get the diagonal of the interaction part of the Hamiltonian of this
+            model, which is a diagonal matrix """
+        diagonal = np.zeros(2 ** self._spin_count)
+        signs = [self._spin_signs(i) for i in range(self._spin_count)]
         for (i, j), strength in self._interaction.items():
-            current += strength * reduce(np.kron, [
-                np.identity(2 ** i),
-                Z_MATRIX,
-                np.identity(2 ** (j - i - 1)),
-                Z_MATRIX,
-                np.identity(2 ** (self._spin_count - j - 1))
-            ])
-        return np.matrix(current)
-    
-    def _external_field_hamiltonian(self, direction: Literal["x", "z"]) -> (
-    np.matrix):
-        """ Get the external field Hamiltonian of one of the two directions """
-        sub_matrix = X_MATRIX if direction == "x" else Z_MATRIX
-        field_strength = (self.external_field_x if direction == "x" else
-        self.external_field_z)
-        current = np.zeros((2 ** self._spin_count, 2 **
-        self._spin_count))
+            diagonal += strength * signs[i] * signs[j]
+        return diagonal
+
+    def _external_field_diagonal(self) -> np.ndarray:
+        """ Get the diagonal of the z-direction external field part of the
+            Hamiltonian, which is a diagonal matrix """
+        diagonal = np.zeros(2 ** self._spin_count)
         for i in range(self._spin_count):
-            current += field_strength * reduce(np.kron, [
-                np.identity(2 ** i),
-                sub_matrix,
-                np.identity(2 ** (self._spin_count - i - 1))
-            ])
-        return np.matrix(current)
+            diagonal += self.external_field_z * self._spin_signs(i)
+        return diagonal
+
+    def _external_field_x_hamiltonian(self) -> sp.csr_array:
+        """ Get the x-direction external field part of the Hamiltonian as a
+            sparse matrix. The X operator on a spin flips the corresponding bit
+            of the basis state index, so the matrix is built directly from the
+            flipped indices """
+        size = 2 ** self._spin_count
+        states = np.arange(size, dtype=np.int64)
+        masks = 1 << np.arange(self._spin_count, dtype=np.int64)
+        rows = np.tile(states, self._spin_count)
+        cols = (states[None, :] ^ masks[:, None]).ravel()
+        data = np.full(len(rows), float(self.external_field_x))
+        return sp.csr_array((data, (rows, cols)), shape=(size, size))
@@ -1,7 +1,7 @@
 
 from ...ising import IsingModel
 from ...wcnf import WeightedCNFFormula
-import numpy as np
+import math
 
 def ising_to_wcnf(model: IsingModel, beta: float) -> WeightedCNFFormula:
     """ Converts an Ising model to a weighted CNF formula, such that the
@@ -24,10 +24,10 @@ def ising_to_wcnf(model: IsingModel, beta: float) -> WeightedCNFFormula:
     # 0 or 1 and indices truth value of variable i
     for index in range(1, n + 1):
         external_field = model.external_field[index - 1]
-        wcnf.weights[index] = np.exp(beta * external_field)
-        wcnf.weights[-index] = np.exp(-beta * external_field)
+        wcnf.weights[index] = math.exp(beta * external_field)
+        wcnf.weights[-index] = math.exp(-beta * external_field)
     # Weight of connections is e^(beta*strength*(2*tau[ij]-1))
     for index, (_, _, strength) in enumerate(interactions, n + 1):
-        wcnf.weights[index] = np.exp(beta * strength)
-        wcnf.weights[-index] = np.exp(-beta * strength)
+        wcnf.weights[index] = math.exp(beta * strength)
+        wcnf.weights[-index] = math.exp(-beta * strength)
     return wcnf
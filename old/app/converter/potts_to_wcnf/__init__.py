@@ -2,7 +2,7 @@
 from ...potts import PottsModel, StandardPottsModel
 from ...wcnf import WeightedCNFFormula
 from itertools import product
-import numpy as np
+import math
 
 def potts_to_wcnf(model: PottsModel, beta: float) -> WeightedCNFFormula:
     """ Convert a potts model to a weighted CNF formula, such that the partition
@@ -26,12 +26,12 @@ def potts_to_wcnf(model: PottsModel, beta: float) -> WeightedCNFFormula:
     # is 0
     for i, si in product(range(n), range(q)):
         index = i * q + si + 1
-        wcnf.weights[index] = np.exp(-beta * model[i, si])
+        wcnf.weights[index] = math.exp(-beta * model[i, si])
         wcnf.weights[-index] = 1.0
     # Weight of connections is e^(-beta*strength) if connection is set and 1
     # otherwise
     for index, (_, _, _, _, strength) in enumerate(interactions, n * q + 1):
-        wcnf.weights[index] = np.exp(-beta * strength)
+        wcnf.weights[index] = math.exp(-beta * strength)
         wcnf.weights[-index] = 1.0
     return wcnf
 
@@ -76,7 +76,7 @@ WeightedCNFFormula):
             ]
         for idx in range(start_index, start_index + k):
             wcnf.weights[idx] = wcnf.weights[-idx] = 1.0
-        wcnf.weights[start_index + k - 1] = np.exp(beta * strength)
+        wcnf.weights[start_index + k - 1] = math.exp(beta * strength)
     # Add restriction that any x1..xk should be less than q, and add weight 1
     # to all of these variables
     for index in range(n):
@@ -3,7 +3,6 @@ from ...ising import IsingModel
 from ...quantum_ising import QuantumIsingModel
 import math
 import numpy as np
-from itertools import product
 
 def quantum_ising_to_ising(quantum_model: QuantumIsingModel, beta: float,
 layers: int) -> tuple[IsingModel, float]:
@@ -25,35 +24,46 @@ layers: int) -> tuple[IsingModel, float]:
         return _trivial_quantum_conversion(quantum_model, beta), 1.0
     assert layers > 2
     gamma = beta * quantum_model.external_field_x
-    inter_layer_strength = np.log(_coth(gamma / layers)) / 2.0
+    # log(coth(x)) / 2 = -log(tanh(x)) / 2, which avoids overflow of cosh and
+    # sinh
+    inter_layer_strength = -math.log(math.tanh(gamma / layers)) / 2.0
     node_count = len(quantum_model)
     model = IsingModel(layers * node_count)
-    # Interactions inside layers
+    # Spin indices and strengths of all interactions are computed with array
+    # broadcasting over the layer offsets. All pairs are distinct and ordered
+    # by construction, so they are set in bulk instead of via set_interaction
     interactions = list(quantum_model.interactions())
-    for layer, interaction in product(range(layers), interactions):
-        i, j, strength = interaction
-        model.set_interaction(layer * node_count + i, layer * node_count + j,
-        beta * strength / layers)
-    # Interactions between layers
-    for layer, i in product(range(layers), range(node_count)):
-        model.set_interaction(layer * node_count + i, (layer + 1) % layers *
-        node_count + i, inter_layer_strength)
+    pairs = np.array([(i, j) for i, j, _ in interactions],
+    dtype=np.int64).reshape(-1, 2)
+    strengths = np.array([strength for _, _, strength in interactions],
+    dtype=np.float64)
+    offsets = np.arange(layers, dtype=np.int64)[:, None] * node_count
+    # Interactions inside layers
+    first = (pairs[None, :, 0] + offsets).ravel()
+    second = (pairs[None, :, 1] + offsets).ravel()
+    scaled = np.tile(strengths * (beta / layers), layers)
+    model._unchecked_update(zip(zip(first.tolist(), second.tolist()),
+    scaled.tolist()))
+    # Interactions between layers, where the last layer wraps around to the
+    # first layer
+    nodes = np.arange(node_count, dtype=np.int64)
+    lower = (offsets[:-1] + nodes).ravel()
+    model._unchecked_update((pair, inter_layer_strength) for pair in zip(
+    lower.tolist(), (lower + node_count).tolist()))
+    model._unchecked_update((pair, inter_layer_strength) for pair in zip(
+    nodes.tolist(), (nodes + (layers - 1) * node_count).tolist()))
     # NOTE: The output model does not have an external field
-    factor = math.sqrt(np.sinh(2.0 * gamma / layers) / 2.0)
+    factor = math.sqrt(math.sinh(2.0 * gamma / layers) / 2.0)
     return model, factor
 
-def _coth(x: float) -> float:
-    """ Hyperbolic cotangent """
-    return np.cosh(x) / np.sinh(x)
-
 def _trivial_quantum_conversion(quantum_model: QuantumIsingModel, beta: float
 ) -> IsingModel:
     """ Conversion of a Quantum Ising Model to an Ising model, in the trivial
         case where the external factors is 0. The output model will have the
         same number of nodes as the input model. Output model will have all
         interaction strengths multiplied by beta """
-    assert quantum_model.external_factor == 0.0
-    model = IsingModel(quantum_model.node_count)
-    for (i, j), strength in quantum_model.interactions.items():
-        model.add_interaction(i, j, strength * beta)
+    assert quantum_model.external_field_x == 0.0
+    model = IsingModel(len(quantum_model))
+    for i, j, strength in quantum_model.interactions():
+        model._unchecked_set(i, j, strength * beta)
     return model
\ No newline at end of file
@@ -1,8 +1,22 @@
 
-from argparse import ArgumentParser
+from argparse import ArgumentParser, ArgumentTypeError
+from functools import partial
 from .import quantum_ising_to_ising
 from ...quantum_ising import QuantumIsingModel
 
+def _int_in_range(value: str, mn: int) -> int:
+    """ Argument type for integers that should be at least mn """
+    try:
+        result = int(value)
+    except ValueError:
+        raise ArgumentTypeError(f"Invalid integer {value!r}")
+    if result < mn:
+        raise ArgumentTypeError(f"Value should be at least {mn}, but is "
+        f"{result}")
+    return result
+
+_INT_GTE_3 = partial(_int_in_range, mn=3)
+
 parser = ArgumentParser(description="Approximate a quantum Ising model using a "
 "classical ising model (the partition function of the classical model "
 "approximates the quantum model). The input is JSON. The output is two lines: "
@@ -17,13 +31,12 @@ parser.add_argument("-o", "--output", type=str, help="The output file to store "
 "console")
 parser.add_argument("-b", "--beta", type=float, help="The inverse temperature "
 "of the partition function. Defaults to 1.0", default=1.0)
-parser.add_argument("-l", "--layers", type=int, help="Number of layers used in "
-"the approximation. Defaults to 10", default=10)
+parser.add_argument("-l", "--layers", type=_INT_GTE_3, help="Number of layers "
+"used in the approximation. Must be at least 3. Defaults to 10", default=10)
 
 args = parser.parse_args()
 
 assert args.beta >= 0.0
-assert args.layers >= 3
 
 with open(args.filename, "r") as f:
     quantum_model = QuantumIsingModel.from_string(f.read())
@@ -94,6 +94,20 @@ class IsingModel:
             existing = self._interaction.get((i, j), 0.0)
         self._interaction[i, j] = existing + strength
 
+    def _unchecked_set(self, i: int, j: int, strength: float):
+        """ Set the interaction strength between two spins i <= j with a single
+            dict assignment. The order of i and j is not checked, so this
+            should only be used when the spin indices are known to be ordered
+            """
+        self._interaction[i, j] = strength
+
+    def _unchecked_update(self, interactions: Iterable[tuple[tuple[int, int],
+    float]]):
+        """ Set the interaction strengths of many pairs of spins (i, j) at once,
+            given as ((i, j), strength). Like _unchecked_set, the spin indices
+            should be known to satisfy i <= j """
+        self._interaction.update(interactions)
+
     def get_external_field(self, i: int) -> float:
         """ Get the external field strength at the given spin index """
         return self._external_field[i]
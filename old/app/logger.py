@@ -1,9 +1,14 @@
 
 from typing import Any
-from datetime import datetime
+import time
 
 STAT_PADDING = 35
 
+# Last wall-clock second for which the timestamp was formatted, and the
+# formatted HH:MM:SS string of that second
+_last_second: int | None = None
+_last_second_string = ""
+
 class ConsoleColor:
     BOLD = "\033[1m"
     RED = "\033[91m"
@@ -13,20 +18,36 @@ class ConsoleColor:
     GREY = "\033[90m"
     CLEAR = "\033[0m"
 
+# Precomputed prefixes and suffix of log lines
+_INFO_PREFIX = ConsoleColor.GREY + "["
+_WARNING_PREFIX = ConsoleColor.YELLOW + "["
+_WARNING_INFIX = "] WARNING: "
+_STAT_PREFIX = ConsoleColor.CYAN
+_CLEAR = ConsoleColor.CLEAR
+
 def log_info(content: Any = ""):
     """ Show an info message """
-    date = datetime.now().strftime("%H:%M:%S.%f")
-    print(f"{ConsoleColor.GREY}[{date}] {content}{ConsoleColor.CLEAR}")
+    print(_INFO_PREFIX, _timestamp(), "] ", content, _CLEAR, sep="")
 
 def log_warning(content: Any = ""):
     """ Show a warning message """
-    date = datetime.now().strftime("%H:%M:%S.%f")
-    print(f"{ConsoleColor.YELLOW}[{date}] WARNING: {content}"
-    f"{ConsoleColor.CLEAR}")
+    print(_WARNING_PREFIX, _timestamp(), _WARNING_INFIX, content, _CLEAR,
+    sep="")
 
 def log_stat(name: str = "", content: Any = "N/A"):
     """ Show a statistic with the given name """
     if name == "":
         return
-    print(ConsoleColor.CYAN + (name + ":").ljust(STAT_PADDING) + " " +
-    ConsoleColor.CLEAR + str(content))
\ No newline at end of file
+    print(_STAT_PREFIX, (name + ":").ljust(STAT_PADDING), " ", _CLEAR, content,
+    sep="")
+
+def _timestamp() -> str:
+    """ Get the current local time as HH:MM:SS.ffffff. The HH:MM:SS part is
+        only formatted once per second """
+    global _last_second, _last_second_string
+    now = time.time()
+    second = int(now)
+    if second != _last_second:
+        _last_second = second
+        _last_second_string = time.strftime("%H:%M:%S", time.localtime(second))
+    return f"{_last_second_string}.{int((now - second) * 1e6):06d}"
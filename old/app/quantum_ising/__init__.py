@@ -7,8 +7,8 @@ import json
 import jsonschema
 import os
 
-X_MATRIX = np.matrix([[0, 1], [1, 0]])
-Z_MATRIX = np.matrix([[1, 0], [0, -1]])
+X_MATRIX = np.array([[0, 1], [1, 0]], dtype=np.float64)
+Z_MATRIX = np.array([[1, 0], [0, -1]], dtype=np.float64)
 
 JSON_SCHEMA = json.loads(open(os.path.join(os.path.dirname(
 __file__), "schema.json"), "r").read())
@@ -98,12 +98,14 @@ class QuantumIsingModel:
         # Partition function is Tr(e^(-beta*H))
         return expm(-beta * self.hamiltonian()).trace()
 
-    def hamiltonian(self) -> np.matrix:
+    def hamiltonian(self) -> np.ndarray:
         """ Determine the Hamiltonian matrix of this model. This method is very
             slow for large models """
-        return -np.matrix(self._interaction_hamiltonian() +
-        self._external_field_hamiltonian("x") +
-        self._external_field_hamiltonian("z"))
+        # Identity matrices by log size, shared between all Kronecker products
+        identities: dict[int, np.ndarray] = {}
+        return -(self._interaction_hamiltonian(identities) +
+        self._external_field_hamiltonian("x", identities) +
+        self._external_field_hamiltonian("z", identities))
     
     def interactions(self) -> Iterable[tuple[int, int, float]]:
         """ Get an iterator over all interactions in the model as tuples (i, j,
@@ -111,23 +113,26 @@ class QuantumIsingModel:
         for (i, j), strength in self._interaction.items():
             yield (i, j, strength)
 
-    def _interaction_hamiltonian(self) -> np.matrix:
-        """ Get the interaction part of the Hamiltonian of this model """
+    def _interaction_hamiltonian(self, identities: dict[int, np.ndarray]) -> (
+    np.ndarray):
+        """ Get the interaction part of the Hamiltonian of this model. The
+            identities dict is used as a cache of identity matrices """
         current = np.zeros((2 ** self._spin_count, 2 ** self._spin_count))
         # Lattice interactions
         for (i, j), strength in self._interaction.items():
             current += strength * reduce(np.kron, [
-                np.identity(2 ** i),
+                _identity(i, identities),
                 Z_MATRIX,
-                np.identity(2 ** (j - i - 1)),
+                _identity(j - i - 1, identities),
                 Z_MATRIX,
-                np.identity(2 ** (self._spin_count - j - 1))
+                _identity(self._spin_count - j - 1, identities)
             ])
-        return np.matrix(current)
+        return current
     
-    def _external_field_hamiltonian(self, direction: Literal["x", "z"]) -> (
-    np.matrix):
-        """ Get the external field Hamiltonian of one of the two directions """
+    def _external_field_hamiltonian(self, direction: Literal["x", "z"],
+    identities: dict[int, np.ndarray]) -> np.ndarray:
+        """ Get the external field Hamiltonian of one of the two directions. The
+            identities dict is used as a cache of identity matrices """
         sub_matrix = X_MATRIX if direction == "x" else Z_MATRIX
         field_strength = (self.external_field_x if direction == "x" else
         self.external_field_z)
@@ -135,8 +140,16 @@ class QuantumIsingModel:
         self._spin_count))
         for i in range(self._spin_count):
             current += field_strength * reduce(np.kron, [
-                np.identity(2 ** i),
+                _identity(i, identities),
                 sub_matrix,
-                np.identity(2 ** (self._spin_count - i - 1))
+                _identity(self._spin_count - i - 1, identities)
             ])
-        return np.matrix(current)
+        return current
+
+def _identity(n: int, cache: dict[int, np.ndarray]) -> np.ndarray:
+    """ Get the 2^n x 2^n identity matrix, reusing the matrix from the cache if
+        it has been made before """
+    identity = cache.get(n)
+    if identity is None:
+        identity = cache[n] = np.identity(2 ** n)
+    return identity
@@ -1,8 +1,15 @@
 
-from typing import Iterable, Literal, get_args
-from itertools import product
+from typing import Iterable, Iterator, Literal, Callable, TextIO, get_args
+from itertools import chain
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import math
 import json
 import jsonschema
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
 from sympy import Symbol
 from sympy.logic.boolalg import to_cnf, BooleanFunction, And, Or, Not
 import os
@@ -13,6 +20,16 @@ WCNF_FORMATS: tuple[WCNFFormat, ...] = get_args(WCNFFormat)
 WCNF_JSON_SCHEMA = json.loads(open(os.path.join(os.path.dirname(__file__),
 "schema.json"), "r").read())
 
+# Number of assignments that are evaluated at once when calculating the total
+# weight of a formula by brute force
+TOTAL_WEIGHT_BLOCK_SIZE = 1 << 16
+# Maximum number of clause-assignment pairs that are checked at once when
+# calculating the total weight of a formula by brute force
+TOTAL_WEIGHT_CHUNK_SIZE = 1 << 16
+# Minimum number of variables for which the total weight of a formula is
+# calculated in multiple processes
+TOTAL_WEIGHT_PARALLEL_VARS = 24
+
 class CNFFormula:
     """ A boolean formula in conjunctive normal form """
 
@@ -21,7 +38,16 @@ class CNFFormula:
         """ Constructor, given the number of variables """
         self._num_vars = num_vars
         # Negative numbers correspond with negations
-        self.clauses = [] if clauses is None else [c.copy() for c in clauses]
+        self._clauses = [] if clauses is None else [c.copy() for c in clauses]
+        # Clauses in CSR form, see _compile(). These are None when the clauses
+        # may have changed since they were compiled
+        self._lits: np.ndarray | None = None
+        self._offs: np.ndarray | None = None
+        # Positive and negative literal bitmasks of every clause as Python
+        # integers, see _int_masks()
+        self._masks: list[tuple[int, int]] | None = None
+        # Incremented whenever the clauses may have changed
+        self._version = 0
 
     def __len__(self):
         """ Get the number of variables in the CNF formula """
@@ -30,7 +56,7 @@ class CNFFormula:
     def __repr__(self):
         """ Canonical representation """
         return (f"{self.__class__.__name__}({self._num_vars!r}, clauses="
-        f"{self.clauses!r})")
+        f"{self._clauses!r})")
 
     def __call__(self, assignment: Iterable[bool]) -> bool:
         """ Get the truth value of the formula given some variables values """
@@ -50,14 +76,31 @@ class CNFFormula:
     def copy(self) -> "CNFFormula":
         """ Create a copy of the CNF formula """
         # NOTE: Clauses are copied in constructor
-        return CNFFormula(self._num_vars, clauses=self.clauses)
+        return CNFFormula(self._num_vars, clauses=self._clauses)
+
+    @property
+    def clauses(self) -> list[list[int]]:
+        """ The clauses of the formula. Since the returned list can be modified
+            in place, the compiled clauses (see _compile) are discarded """
+        self._invalidate()
+        return self._clauses
+
+    @clauses.setter
+    def clauses(self, clauses: list[list[int]]):
+        """ Replace the clauses of the formula """
+        self._clauses = clauses
+        self._invalidate()
 
     def assignment_truth(self, assignment: Iterable[bool]) -> bool:
         """ Get the truth value of the formula given some variable values """
         assignment = list(assignment)
         assert len(assignment) == self._num_vars
-        return all(self._clause_truth(clause, assignment) for clause in
-        self.clauses)
+        # A clause holds if the assignment sets one of its positive literals or
+        # clears one of its negative literals
+        value = sum(1 << i for i, v in enumerate(assignment) if v)
+        inverted = ~value
+        return all((value & pos) | (inverted & neg) for pos, neg in
+        self._int_masks())
 
     @classmethod
     def _process_sympy_and(cls, formula: And | Or | Not | Symbol, indices: dict[
@@ -88,13 +131,94 @@ class CNFFormula:
             return -cls._process_sympy_term(formula.args[0], indices)
         return indices.setdefault(formula.name, len(indices) + 1)
 
-    def _clause_truth(self, clause: list[int], assignment: list[bool]) -> bool:
-        """ Check if the given clause holds, given assignment of variables """
-        for i in clause:
-            target = i > 0
-            if assignment[abs(i) - 1] == target:
-                return True
-        return False
+    def _compile(self) -> tuple[np.ndarray, np.ndarray]:
+        """ Get the clauses in CSR form, as a flat array of all literals and an
+            array of clause offsets into it of length num_clauses + 1. The
+            arrays are cached until the clauses are accessed or replaced """
+        if self._lits is None or self._offs is None:
+            self._offs = np.zeros(len(self._clauses) + 1, dtype=np.int32)
+            np.cumsum([len(c) for c in self._clauses], out=self._offs[1:])
+            self._lits = np.fromiter(chain.from_iterable(self._clauses),
+            dtype=np.int32, count=self._offs[-1])
+        return self._lits, self._offs
+
+    def _invalidate(self):
+        """ Discard everything that is derived from the clauses, since these
+            may have changed """
+        self._lits = self._offs = self._masks = None
+        self._version += 1
+
+    def _int_masks(self) -> list[tuple[int, int]]:
+        """ Get the bitmasks of the positive and negative literals of every
+            clause as Python integers, where bit i corresponds with variable
+            i + 1. Unlike _clause_masks this works for any number of variables.
+            The masks are cached like the compiled clauses """
+        if self._masks is None:
+            self._masks = []
+            for clause in self._clauses:
+                pos = neg = 0
+                for i in clause:
+                    if i > 0:
+                        pos |= 1 << (i - 1)
+                    else:
+                        neg |= 1 << (-i - 1)
+                self._masks.append((pos, neg))
+        return self._masks
+
+    def _simplify(self) -> "tuple[CNFFormula, list[int]] | None":
+        """ Simplify the formula for counting. Duplicate literals and clauses
+            and tautological clauses are removed, after which unit clauses are
+            propagated until none are left. Returns the simplified formula over
+            the same variables and the literals forced by unit clauses, or None
+            if the formula is found to be unsatisfiable """
+        clauses = {tuple(sorted(set(clause))) for clause in self._clauses}
+        clauses = {c for c in clauses if not any(-i in c for i in c)}
+        units: set[int] = set()
+        while True:
+            if () in clauses:
+                return None
+            new_units = {c[0] for c in clauses if len(c) == 1}
+            if not new_units:
+                break
+            if any(-i in new_units or -i in units for i in new_units):
+                return None
+            units |= new_units
+            # Drop satisfied clauses and remove violated literals
+            clauses = {tuple(i for i in c if -i not in units) for c in clauses
+            if not any(i in units for i in c)}
+        return (CNFFormula(self._num_vars, clauses=[list(c) for c in
+        sorted(clauses)]), sorted(units))
+
+    def _components(self) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        """ Split the formula into connected components, where variables are
+            connected if they occur in the same clause. Yields for every
+            component an array of its variables and an array of the indices of
+            its clauses """
+        lits, offs = self._compile()
+        n, m = self._num_vars, len(offs) - 1
+        # Bipartite graph with variables as nodes 0, ..., n - 1 and clauses as
+        # nodes n, ..., n + m - 1
+        clause_nodes = n + np.repeat(np.arange(m), np.diff(offs))
+        graph = sp.coo_array((np.ones(len(lits), dtype=np.int8), (clause_nodes,
+        np.abs(lits) - 1)), shape=(n + m, n + m))
+        count, labels = connected_components(graph, directed=False)
+        order = np.argsort(labels, kind="stable")
+        bounds = np.searchsorted(labels[order], np.arange(count + 1))
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            nodes = order[start:stop]
+            yield nodes[nodes < n] + 1, nodes[nodes >= n] - n
+
+    def _clause_masks(self) -> tuple[np.ndarray, np.ndarray]:
+        """ Get bitmasks of the positive and negative literals of every clause,
+            where bit i corresponds with variable i + 1. Only works for formulae
+            with at most 64 variables """
+        lits, offs = self._compile()
+        bits = np.left_shift(np.uint64(1), (np.abs(lits) - 1).astype(
+        np.uint64))
+        zero = np.uint64(0)
+        return (_reduce_clauses(np.bitwise_or, np.where(lits > 0, bits, zero),
+        offs), _reduce_clauses(np.bitwise_or, np.where(lits < 0, bits, zero),
+        offs))
 
 class VariableWeights:
     """ Object that assigns weights to variables and their negations """
@@ -104,7 +228,14 @@ class VariableWeights:
         """ Constructor with a number of variables to assign weights to.
             Optionally some weights can be given in the form of a dict """
         self._num_vars = num_vars
-        self._weights: list[float | None] = [None] * (num_vars * 2)
+        # Weights of variables and their negations, indexed by variable, and
+        # whether these weights are set. Index 0 is unused
+        self._wpos = np.zeros(num_vars + 1)
+        self._wneg = np.zeros(num_vars + 1)
+        self._has_pos = np.zeros(num_vars + 1, dtype=np.bool_)
+        self._has_neg = np.zeros(num_vars + 1, dtype=np.bool_)
+        # Incremented whenever the weights change
+        self._version = 0
         if weights is not None:
             for var, value in weights.items():
                 self.set_weight(var, value)
@@ -134,48 +265,60 @@ class VariableWeights:
 
     def copy(self) -> "VariableWeights":
         """ Create a copy of the variable weights """
-        return VariableWeights(self._num_vars, weights=self._weights_dict())
+        weights = VariableWeights(self._num_vars)
+        weights._wpos[:] = self._wpos
+        weights._wneg[:] = self._wneg
+        weights._has_pos[:] = self._has_pos
+        weights._has_neg[:] = self._has_neg
+        return weights
 
     def get_weight(self, var: int) -> float | None:
-        """ Get the weight of a variable (negative variables indicate negations)
-            """
-        return self._weights[self._variable_index(var)]
+        """ Get the weight of a variable (negative variables indicate
+            negations). The variable should be non-zero and at most the number
+            of variables, which is not checked """
+        if var > 0:
+            return float(self._wpos[var]) if self._has_pos[var] else None
+        return float(self._wneg[-var]) if self._has_neg[-var] else None
 
     def set_weight(self, var: int, value: float | None):
         """ Set the weight of a variable (negative variables indicate negations)
             """
-        self._weights[self._variable_index(var)] = value
+        self._check_variable(var)
+        weights, has = ((self._wpos, self._has_pos) if var > 0 else
+        (self._wneg, self._has_neg))
+        weights[abs(var)] = 0.0 if value is None else value
+        has[abs(var)] = value is not None
+        self._version += 1
 
     def get_derived_weight(self, var: int) -> float:
         """ Get the weight of a variable. If this is None return one minus the
-            weight of the negation. If this is also None return 0.5 """
-        if self.get_weight(var) is not None:
-            return self.get_weight(var)
-        if self.get_weight(-var) is not None:
-            return 1.0 - self.get_weight(-var)
-        return 0.5
+            weight of the negation. If this is also None return 0.5. The same
+            restrictions on the variable hold as for get_weight """
+        weight = self.get_weight(var)
+        if weight is not None:
+            return weight
+        weight = self.get_weight(-var)
+        return 0.5 if weight is None else 1.0 - weight
 
     def get_assignment_weight(self, assignment: Iterable[bool]) -> float:
         """ Get the weight given some assignment of variable values """
-        assignment = list(assignment)
-        assert len(assignment) == self._num_vars
-        result = 1.0
-        for i, value in enumerate(assignment, 1):
-            i = i if value else -i
-            result *= self.get_derived_weight(i)
-        return result
+        values = np.fromiter(assignment, dtype=np.bool_)
+        assert len(values) == self._num_vars
+        weights_true, weights_false = self._derived_weights()
+        return float(np.where(values, weights_true[1:], weights_false[1:]
+        ).prod())
 
     def has_missing(self) -> bool:
         """ Check if there are any weights that are unset (both positive and
             negative) """
-        return any(weight is None for weight in self._weights)
+        return not (self._has_pos[1:].all() and self._has_neg[1:].all())
 
     def add_missing(self):
         """ Adds any missing weights by assigning every weight their derived
             weight using the get_derived_weight method """
-        for i in range(1, self._num_vars + 1):
-            self.set_weight(i, self.get_derived_weight(i))
-            self.set_weight(-i, self.get_derived_weight(-i))
+        self._wpos, self._wneg = self._derived_weights()
+        self._has_pos[:] = self._has_neg[:] = True
+        self._version += 1
 
     def normalize(self) -> float:
         """ Normalize the weights such that weight(x) + weight(-x) = 1. Any
@@ -183,28 +326,55 @@ class VariableWeights:
             Returns the product of all factors that the weights should be
             multiplied with to get the original weights back """
         self.add_missing()
-        factor = 1.0
-        for i in range(1, self._num_vars + 1):
-            pos, neg = self.get_derived_weight(i), self.get_derived_weight(-i)
-            assert pos != 0.0 or neg != 0.0
-            cur_factor = pos + neg
-            factor *= cur_factor
-            self.set_weight(i, pos / cur_factor)
-            self.set_weight(-i, neg / cur_factor)
-        return factor
+        totals = self._wpos[1:] + self._wneg[1:]
+        assert not ((self._wpos[1:] == 0.0) & (self._wneg[1:] == 0.0)).any()
+        zero = np.flatnonzero(totals == 0.0)
+        if len(zero) > 0:
+            raise ZeroDivisionError(f"Weights of variable {zero[0] + 1} sum to "
+            f"zero")
+        self._wpos[1:] /= totals
+        self._wneg[1:] /= totals
+        self._version += 1
+        return float(np.prod(totals))
 
     def uniform_multiply(self, factor: float):
         """ Multiply all weights (if they are set) with the given factor """
-        for i in range(1, self._num_vars + 1):
-            for v in (i, -i):
-                if self.get_weight(v) is not None:
-                    self.set_weight(v, self.get_weight(v) * factor)
-
-    def _variable_index(self, var: int) -> int:
-        """ Get the index in the weights list corresponding with the given
-            variable (which can be negative) """
+        # NOTE: Missing weights remain missing
+        self._wpos *= factor
+        self._wneg *= factor
+        self._version += 1
+
+    def items(self) -> Iterator[tuple[int, float | None]]:
+        """ Iterate over all variables (both positive and negative) and their
+            weights, in the order -num_vars, ..., -1, 1, ..., num_vars """
+        return zip(chain(range(-self._num_vars, 0), range(1, self._num_vars +
+        1)), _optional_list(np.concatenate((self._wneg[:0:-1],
+        self._wpos[1:])), np.concatenate((self._has_neg[:0:-1],
+        self._has_pos[1:]))))
+
+    def _load(self, positive: list[float | None], negative: list[float | None]):
+        """ Set all weights at once, given the weights of variables 1, ...,
+            num_vars and of their negations """
+        self._wpos[1:] = [0.0 if w is None else w for w in positive]
+        self._wneg[1:] = [0.0 if w is None else w for w in negative]
+        self._has_pos[1:] = [w is not None for w in positive]
+        self._has_neg[1:] = [w is not None for w in negative]
+        self._version += 1
+
+    def _derived_weights(self) -> tuple[np.ndarray, np.ndarray]:
+        """ Get arrays of the derived weights (see get_derived_weight) of
+            variables and their negations, indexed by variable. Index 0 is
+            unused """
+        pos = np.where(self._has_pos, self._wpos, np.where(self._has_neg, 1.0 -
+        self._wneg, 0.5))
+        neg = np.where(self._has_neg, self._wneg, np.where(self._has_pos, 1.0 -
+        self._wpos, 0.5))
+        return pos, neg
+
+    def _check_variable(self, var: int):
+        """ Check that the given variable (which can be negative) is in range
+            """
         assert var != 0 and abs(var) <= self._num_vars
-        return var - (1 if var > 0 else 0) + self._num_vars
     
     def _weights_dict(self) -> dict[int, float]:
         """ Get a dictionary mapping all variables (both positive and negative)
@@ -231,6 +401,11 @@ class WeightedCNFFormula:
         self.formula = CNFFormula(num_vars) if formula is None else formula
         self.weights = VariableWeights(num_vars) if weights is None else weights
         assert len(self.formula) == len(self.weights) == self._num_vars
+        # Specialized assignment weight function, see _weight_function()
+        self._weight_function_key: tuple[CNFFormula, int, VariableWeights,
+        int] | None = None
+        self._compiled_weight_function: Callable[[tuple[bool, ...]], float] | (
+        None) = None
 
     def __len__(self) -> int:
         """ Number of variables in the weighted CNF formula """
@@ -254,10 +429,7 @@ class WeightedCNFFormula:
         assert (len(data["positive_weights"]) == len(data["negative_weights"])
         == data["num_vars"])
         wcnf.formula.clauses = data["clauses"]
-        for i, value in enumerate(data["positive_weights"], 1):
-            wcnf.weights[i] = value
-        for i, value in enumerate(data["negative_weights"], 1):
-            wcnf.weights[-i] = value
+        wcnf.weights._load(data["positive_weights"], data["negative_weights"])
         return wcnf
 
     @classmethod
@@ -282,94 +454,293 @@ class WeightedCNFFormula:
             is set to anything other than JSON, there should not be any missing
             weights. Solvers may also require weight normalization to work
             properly """
+        return "\n".join(self.iter_lines(output_format))
+
+    def iter_lines(self, output_format: WCNFFormat = "json") -> Iterator[str]:
+        """ Get an iterator over the lines of the formatted string (see
+            to_string), which allows writing large formulae without building
+            the full string in memory """
         if output_format != "json" and self.weights.has_missing():
             raise RuntimeError(f"Cannot format to {output_format} when there "
             f"are missing weights")
-        match output_format:
-            case "cachet":
-                assert not self.weights.has_missing()
-                return self._to_cachet()
-            case "dpmc":
-                assert not self.weights.has_missing()
-                return self._to_dpmc()
-            case "json":
-                return self._to_json()
-            case "ganak":
-                return self._to_ganak()
-            case _:
-                raise RuntimeError(f"Unknown output format {output_format}")
+        formatter = _FORMATTERS.get(output_format)
+        if formatter is None:
+            raise RuntimeError(f"Unknown output format {output_format}")
+        return formatter(self)
+
+    def write(self, file: TextIO, output_format: WCNFFormat = "json"):
+        """ Write the formatted string (see to_string) to a file line by line
+            """
+        file.writelines(line + "\n" for line in
+        self.iter_lines(output_format))
 
     def copy(self) -> "WeightedCNFFormula":
         """ Create a (deep) copy of the weighted CNF formula """
         return WeightedCNFFormula(self._num_vars, formula=self.formula.copy(),
         weights=self.weights.copy())
 
+    def assignment_weight(self, assignment: Iterable[bool]) -> float:
+        """ Get the weight of an assignment of variable values, which is zero
+            if the assignment does not satisfy the CNF formula """
+        if not isinstance(assignment, tuple):
+            assignment = tuple(assignment)
+        assert len(assignment) == self._num_vars
+        return self._weight_function()(assignment)
+
     def total_weight(self):
         """ Get the total weight over all assignments of truth values that
             satisfy the CNF formula. This is a very slow method since it uses
-            brute force """
-        total = 0.0
-        for assignment in product((False, True), repeat=self._num_vars):
-            if self.formula(assignment):
-                total += self.weights(assignment)
-        return total
+            brute force, but the formula is first simplified with unit
+            propagation and split into components that do not share variables,
+            which are counted separately """
+        simplified = self.formula._simplify()
+        if simplified is None:
+            return 0.0
+        formula, units = simplified
+        lits, offs = formula._compile()
+        weights_true, weights_false = self.weights._derived_weights()
+        # The factors of the forced literals, unconstrained variables and
+        # components are multiplied with _scaled_product, such that their
+        # product does not underflow or overflow along the way
+        factors = [float(weights_true[i] if i > 0 else weights_false[-i]) for i
+        in units]
+        forced = {abs(i) for i in units}
+        # Map every variable to its (one-based) index within its component.
+        # The components do not share variables, so all literals can be
+        # remapped at once
+        components = list(formula._components())
+        index = np.zeros(self._num_vars + 1, dtype=np.int32)
+        for variables, _ in components:
+            index[variables] = np.arange(1, len(variables) + 1)
+        remapped = (np.sign(lits) * index[np.abs(lits)]).tolist()
+        for variables, clauses in components:
+            if len(clauses) == 0:
+                # Unconstrained variable, unless its value is forced
+                if variables[0] not in forced:
+                    factors.append(float(weights_true[variables[0]] +
+                    weights_false[variables[0]]))
+                continue
+            component = CNFFormula(len(variables), clauses=[remapped[offs[c]:
+            offs[c + 1]] for c in clauses])
+            factors.append(_brute_force_weight(component,
+            weights_true[variables], weights_false[variables]))
+        return _scaled_product(factors)
     
-    def _to_json(self) -> str:
-        """ Format this object to a JSON string """
-        return json.dumps({
+    def _weight_function(self) -> Callable[[tuple[bool, ...]], float]:
+        """ Get a function that is specialized to the current formula and
+            weights, which returns the weight of an assignment tuple if it
+            satisfies the formula and zero otherwise. The function is generated
+            again when the formula or weights are replaced or changed, which is
+            tracked by their version counters """
+        key = (self.formula, self.formula._version, self.weights,
+        self.weights._version)
+        if self._weight_function_key != key:
+            weights_true, weights_false = self.weights._derived_weights()
+            self._compiled_weight_function = _generate_weight_function(
+            self.formula._clauses, weights_true[1:].tolist(),
+            weights_false[1:].tolist())
+            self._weight_function_key = key
+        return self._compiled_weight_function
+
+    def _json_lines(self) -> Iterator[str]:
+        """ Format this object to a JSON string, which is a single line """
+        yield json.dumps({
             "num_vars": self._num_vars,
-            "positive_weights": [self.weights[i] for i in range(1,
-            self._num_vars + 1)],
-            "negative_weights": [self.weights[-i] for i in range(1,
-            self._num_vars + 1)],
-            "clauses": self.formula.clauses,
+            "positive_weights": _optional_list(self.weights._wpos[1:],
+            self.weights._has_pos[1:]),
+            "negative_weights": _optional_list(self.weights._wneg[1:],
+            self.weights._has_neg[1:]),
+            "clauses": self.formula._clauses,
         })
 
-    def _to_cachet(self) -> str:
-        """ Convert this object to a Cachet formatted string """
-        text: list[str] = []
+    def _cachet_lines(self) -> Iterator[str]:
+        """ Get the lines of a Cachet formatted string of this object """
         # CNF description
-        text.append(f"p cnf {self._num_vars} {len(self.formula.clauses)}")
+        yield f"p cnf {self._num_vars} {len(self.formula._clauses)}"
         # Variable weights
-        for i in range(1, self._num_vars + 1):
-            text.append(f"w {i} {self.weights[i]}")
+        yield from map("w %d %r".__mod__, enumerate(
+        self.weights._wpos[1:].tolist(), 1))
         # Clauses
-        for clause in self.formula.clauses:
-            text.append("".join(map(lambda i: str(i) + " ", clause)) + "0")
-        return "\n".join(text)
+        yield from _format_clauses(self.formula._clauses)
 
-    def _to_dpmc(self) -> str:
-        """ Convert this object to a DPMC formatted string """
-        text: list[str] = []
+    def _dpmc_lines(self) -> Iterator[str]:
+        """ Get the lines of a DPMC formatted string of this object """
         # CNF description
-        text.append(f"p cnf {self._num_vars} {len(self.formula.clauses)}")
+        yield f"p cnf {self._num_vars} {len(self.formula._clauses)}"
         # Sum-vars
-        vars_string = "".join(map(lambda i: str(i) + " ", range(1,
-        self._num_vars + 1)))
-        text.append(f"c p show {vars_string}0")
+        yield self._show_line()
         # Variable weights
-        for i in filter(lambda x: x != 0, range(-self._num_vars, self._num_vars
-        + 1)):
-            text.append(f"c p weight {i} {self.weights[i]}")
+        yield from map("c p weight %d %r".__mod__, self.weights.items())
         # Clauses
-        for clause in self.formula.clauses:
-            text.append("".join(map(lambda i: str(i) + " ", clause)) + "0")
-        return "\n".join(text)
+        yield from _format_clauses(self.formula._clauses)
 
-    def _to_ganak(self) -> str:
-        """ Convert this object to a Ganak formatted string """
-        text: list[str] = []
+    def _ganak_lines(self) -> Iterator[str]:
+        """ Get the lines of a Ganak formatted string of this object """
         # CNF description
-        text.append(f"p cnf {self._num_vars} {len(self.formula.clauses)}")
+        yield f"p cnf {self._num_vars} {len(self.formula._clauses)}"
         # Sum-vars
-        vars_string = "".join(map(lambda i: str(i) + " ", range(1,
-        self._num_vars + 1)))
-        text.append(f"c p show {vars_string}0")
+        yield self._show_line()
         # Variable weights
-        for i in filter(lambda x: x != 0, range(-self._num_vars, self._num_vars
-        + 1)):
-            text.append(f"c p weight {i} {self.weights[i]} 0")
+        yield from map("c p weight %d %r 0".__mod__, self.weights.items())
         # Clauses
-        for clause in self.formula.clauses:
-            text.append("".join(map(lambda i: str(i) + " ", clause)) + "0")
-        return "\n".join(text)
+        yield from _format_clauses(self.formula._clauses)
+
+    def _show_line(self) -> str:
+        """ Get the line declaring all variables as sum-vars, in the format used
+            by DPMC and Ganak """
+        return " ".join(["c p show", *map(str, range(1, self._num_vars + 1)),
+        "0"])
+
+def _optional_list(values: np.ndarray, has: np.ndarray) -> list[float | None]:
+    """ Convert an array of weights to a list, where weights are replaced with
+        None if they are not set according to the given mask """
+    return [w if h else None for w, h in zip(values.tolist(), has.tolist())]
+
+def _reduce_clauses(ufunc: np.ufunc, values: np.ndarray, offsets: np.ndarray
+) -> np.ndarray:
+    """ Reduce per-literal values to per-clause values with the given ufunc,
+        given the clause offsets of a CSR formula. Empty clauses get the
+        identity of the ufunc """
+    result = np.full(len(offsets) - 1, ufunc.identity, dtype=values.dtype)
+    nonempty = offsets[1:] > offsets[:-1]
+    if nonempty.any():
+        # Empty clauses contain no literals, so skipping their offsets leaves
+        # the ranges of all other clauses intact
+        result[nonempty] = ufunc.reduceat(values, offsets[:-1][nonempty])
+    return result
+
+def _generate_weight_function(clauses: list[list[int]], weights_true:
+list[float], weights_false: list[float]) -> Callable[[tuple[bool, ...]],
+float]:
+    """ Generate a function that returns the weight of an assignment tuple if
+        it satisfies the given clauses and zero otherwise. All clauses and
+        weights are written out in the source, so evaluating the function does
+        not need any lookups besides indexing the assignment """
+    condition = " and ".join("(" + (" or ".join(f"a[{i - 1}]" if i > 0 else
+    f"not a[{-i - 1}]" for i in clause) or "False") + ")" for clause in
+    _ordered_clauses(clauses)) or "True"
+    factors = ", ".join(f"({pos!r} if a[{i}] else {neg!r})" for i, (pos, neg)
+    in enumerate(zip(weights_true, weights_false)))
+    source = (f"def weight(a):\n    if not ({condition}):\n        return 0.0\n"
+    f"    return prod([{factors}])\n")
+    # Names needed for the generated source, including non-finite weights
+    namespace = {"prod": math.prod, "inf": math.inf, "nan": math.nan}
+    exec(source, namespace)
+    return namespace["weight"]
+
+def _ordered_clauses(clauses: list[list[int]]) -> list[list[int]]:
+    """ Reorder clauses for short-circuit evaluation. Short clauses are placed
+        first, since these are most likely to be violated. Literals within a
+        clause are ordered by descending number of occurrences of their
+        variable in the formula """
+    counts = Counter(abs(i) for clause in clauses for i in clause)
+    return sorted((sorted(clause, key=lambda i: -counts[abs(i)]) for clause in
+    clauses), key=len)
+
+def _brute_force_weight(formula: CNFFormula, weights_true: np.ndarray,
+weights_false: np.ndarray) -> float:
+    """ Get the total weight of all satisfying assignments of a CNF formula by
+        brute force, given the weights of every variable and its negation (at
+        index i for variable i + 1) """
+    n = len(formula)
+    if n > 63:
+        raise ValueError(f"Cannot determine total weight of formula with {n} "
+        f"connected variables by brute force")
+    pos_masks, neg_masks = formula._clause_masks()
+    # Short clauses are checked first, since these are most likely to be
+    # violated, which allows the kernel to stop early
+    order = np.argsort(np.diff(formula._compile()[1]), kind="stable")
+    kernel = partial(_total_weight_kernel, pos_masks[order], neg_masks[order],
+    weights_true, weights_false)
+    block_count = 1 << (n - _low_bit_count(n))
+    if n < TOTAL_WEIGHT_PARALLEL_VARS:
+        return kernel(0, block_count)
+    # Split the blocks, which are indexed by the high bits of the assignments,
+    # into chunks that are handled by separate processes
+    chunk_count = min(block_count, 4 * (os.cpu_count() or 1))
+    bounds = [block_count * i // chunk_count for i in range(chunk_count + 1)]
+    with ProcessPoolExecutor() as executor:
+        return sum(executor.map(kernel, bounds[:-1], bounds[1:]))
+
+def _scaled_product(factors: Iterable[float]) -> float:
+    """ Multiply the given factors, keeping track of the exponent of the
+        intermediate result separately such that it cannot underflow or
+        overflow """
+    mantissa, exponent = 1.0, 0
+    for factor in factors:
+        factor_mantissa, factor_exponent = math.frexp(factor)
+        mantissa, shift = math.frexp(mantissa * factor_mantissa)
+        exponent += factor_exponent + shift
+    try:
+        return math.ldexp(mantissa, exponent)
+    except OverflowError:
+        return math.copysign(math.inf, mantissa)
+
+def _low_bit_count(n: int) -> int:
+    """ Get the number of low bits of the assignments that are enumerated
+        within a single block by the total weight kernel, given the number of
+        variables """
+    return min(n, TOTAL_WEIGHT_BLOCK_SIZE.bit_length() - 1)
+
+def _total_weight_kernel(pos_masks: np.ndarray, neg_masks: np.ndarray,
+weights_true: np.ndarray, weights_false: np.ndarray, start: int, stop: int) -> (
+float):
+    """ Get the total weight of all satisfying assignments, given bitmasks of
+        the positive and negative literals of every clause and the weights of
+        every variable. Assignments are enumerated in blocks as bitmasks, where
+        bit i is the value of variable i + 1. A clause is satisfied by an
+        assignment a if (a & pos) | (~a & neg) is nonzero. Within a block the
+        high bits are fixed, so the weights of the low bits are computed only
+        once, and clauses that are satisfied by the high bits are skipped. Only
+        the blocks with high bits in the range [start, stop) are included """
+    n = len(weights_true)
+    low_count = _low_bit_count(n)
+    low_mask = np.uint64((1 << low_count) - 1)
+    low = np.arange(1 << low_count, dtype=np.uint64)
+    inverted_low = ~low
+    values = ((low[:, None] >> np.arange(low_count, dtype=np.uint64)) &
+    np.uint64(1)).astype(np.bool_)
+    low_weights = np.where(values, weights_true[:low_count],
+    weights_false[:low_count]).prod(axis=1)
+    pos_low, neg_low = pos_masks & low_mask, neg_masks & low_mask
+    pos_high, neg_high = pos_masks & ~low_mask, neg_masks & ~low_mask
+    chunk_size = max(1, TOTAL_WEIGHT_CHUNK_SIZE // len(low))
+    total = 0.0
+    for high in range(start, stop):
+        high_value = np.uint64(high << low_count)
+        high_weight = 1.0
+        for i in range(low_count, n):
+            high_weight *= (weights_true[i] if (high >> (i - low_count)) & 1
+            else weights_false[i])
+        active = np.flatnonzero(((high_value & pos_high) | (~high_value &
+        neg_high)) == 0)
+        satisfied = np.ones(len(low), dtype=np.bool_)
+        # Check a chunk of clauses at once as a 2D array
+        for i in range(0, len(active), chunk_size):
+            c = active[i:i + chunk_size, None]
+            satisfied &= (((low & pos_low[c]) | (inverted_low & neg_low[c])) !=
+            0).all(axis=0)
+            if not satisfied.any():
+                break
+        total += float(high_weight * low_weights[satisfied].sum())
+    return total
+
+def _format_clauses(clauses: Iterable[list[int]]) -> Iterator[str]:
+    """ Format clauses as DIMACS clause lines, each terminated by a 0. A format
+        string is made once for every clause length, so every clause is
+        formatted with a single % operation """
+    formats: dict[int, str] = {}
+    for clause in clauses:
+        fmt = formats.get(len(clause))
+        if fmt is None:
+            fmt = formats[len(clause)] = "%d " * len(clause) + "0"
+        yield fmt % tuple(clause)
+
+# Formatting functions for each output format, used by to_string
+_FORMATTERS: dict[WCNFFormat, Callable[[WeightedCNFFormula], Iterator[str]]
+] = {
+    "cachet": WeightedCNFFormula._cachet_lines,
+    "dpmc": WeightedCNFFormula._dpmc_lines,
+    "json": WeightedCNFFormula._json_lines,
+    "ganak": WeightedCNFFormula._ganak_lines,
+}
@@ -2,6 +2,7 @@
 from ..formula import WeightedCNFFormula
 from ...logger import log_info, log_warning, log_stat
 import os
+import re
 from subprocess import Popen, PIPE, TimeoutExpired
 from time import time
 from typing import Literal, get_args
@@ -47,12 +48,10 @@ class Solver:
     "Solver"):
         """ Get a specific solver interface given by the solver name. Other
             arguments for the solver constructor can be passed as well """
-        match solver_type:
-            case "cachet": return CachetSolver(*args, **kwargs)
-            case "dpmc": return DPMCSolver(*args, **kwargs)
-            case "tensororder": return TensorOrderSolver(*args, **kwargs)
-            case "ganak": return GanakSolver(*args, **kwargs)
-        raise RuntimeError(f"Unsupported solver type {solver_type}")
+        solver_class = _SOLVER_CLASSES.get(solver_type)
+        if solver_class is None:
+            raise RuntimeError(f"Unsupported solver type {solver_type}")
+        return solver_class(*args, **kwargs)
 
     def run_solver(self, formula: WeightedCNFFormula) -> SolverResult:
         """ Run the solver on the given weighted CNF formula and return an
@@ -77,7 +76,7 @@ class DPMCSolver(Solver):
     def _create_file(self, formula: WeightedCNFFormula):
         """ Create the output file to pass to the solver """
         with open(self.output_path, "w") as f:
-            f.write(formula.to_string("dpmc"))
+            formula.write(f, "dpmc")
 
     def _calculate_from_file(self) -> SolverResult:
         """ Calculate total weight of wCNF formula in the given .cnf file """
@@ -95,14 +94,13 @@ class DPMCSolver(Solver):
         except TimeoutExpired:
             return SolverResult(False)
         end = time()
-        result = output.decode("utf-8")
-        for line in result.split("\n"):
-            if line.startswith("c s exact double prec-sci"):
-                weight = float(line.split()[-1])
-                if self.show_log:
-                    log_stat("Solver output", weight)
-                return SolverResult(True, end - start, weight)
-        return SolverResult(False)
+        weights = _line_values(output.decode("utf-8"),
+        "c s exact double prec-sci")
+        if not weights:
+            return SolverResult(False)
+        if self.show_log:
+            log_stat("Solver output", weights[0])
+        return SolverResult(True, end - start, weights[0])
 
 class CachetSolver(Solver):
     """ Solver interface for the Cachet solver """
@@ -132,7 +130,7 @@ class CachetSolver(Solver):
     def _create_file(self, formula: WeightedCNFFormula):
         """ Create the output file to pass to the solver """
         with open(self.output_path, "w") as f:
-            f.write(formula.to_string("cachet"))
+            formula.write(f, "cachet")
 
     def _calculate_from_file(self) -> SolverResult:
         """ Convert the given wCNF formula to the format that the solver can use
@@ -147,14 +145,12 @@ class CachetSolver(Solver):
             end = time()
         except TimeoutExpired:
             return SolverResult(False)
-        result = output.decode("utf-8")
-        for line in result.split("\n"):
-            if line.startswith("Satisfying probability"):
-                weight = float(line.split()[-1])
-                if self.show_log:
-                    log_stat("Solver output", weight)
-                return SolverResult(True, end - start, weight)
-        return SolverResult(False)
+        weights = _line_values(output.decode("utf-8"), "Satisfying probability")
+        if not weights:
+            return SolverResult(False)
+        if self.show_log:
+            log_stat("Solver output", weights[0])
+        return SolverResult(True, end - start, weights[0])
 
 class TensorOrderSolver(Solver):
     """ Solver interface for the TensorOrder solver """
@@ -184,7 +180,7 @@ class TensorOrderSolver(Solver):
     def _create_file(self, formula: WeightedCNFFormula):
         """ Create the output file to pass to the solver """
         with open(self.output_path, "w") as f:
-            f.write(formula.to_string("cachet"))
+            formula.write(f, "cachet")
 
     def _calculate_from_file(self) -> float:
         """ Convert the given wCNF formula to the format that the solver can use
@@ -202,21 +198,18 @@ class TensorOrderSolver(Solver):
         except TimeoutExpired:
             return SolverResult(False)
         result = output.decode("utf-8")
-        time_taken = count = None
-        for line in result.split("\n"):
-            if line.startswith("Total Time:"):
-                time_taken = float(line.split()[-1])
-            if line.startswith("Count:"):
-                count = float(line.split()[-1])
-                if self.show_log:
-                    log_stat("Solver output", count)
-        if count is None:
+        times, counts = (_line_values(result, "Total Time:"),
+        _line_values(result, "Count:"))
+        if not counts:
             return SolverResult(False)
-        if time_taken is None:
-            time_taken = -1.0
+        count = counts[-1]
+        if self.show_log:
+            log_stat("Solver output", count)
+        if not times:
             if self.show_log:
                 log_warning("TensorOrder measured time not found")
-        return SolverResult(True, time_taken, count)
+            return SolverResult(True, -1.0, count)
+        return SolverResult(True, times[-1], count)
     
 class GanakSolver(Solver):
     """ Solver interface for the Ganak solver """
@@ -238,7 +231,7 @@ class GanakSolver(Solver):
     def _create_file(self, formula: WeightedCNFFormula):
         """ Create the output file to pass to the solver """
         with open(self.output_path, "w") as f:
-            f.write(formula.to_string("ganak"))
+            formula.write(f, "ganak")
 
     def _calculate_from_file(self) -> float:
         """ Convert the given wCNF formula to the format that the solver can use
@@ -252,18 +245,31 @@ class GanakSolver(Solver):
         except TimeoutExpired:
             return SolverResult(False)
         result = output.decode("utf-8")
-        time_taken = count = None
-        for line in result.split("\n"):
-            if line.startswith("c o Total time [Arjun+GANAK]:"):
-                time_taken = float(line.split()[-1])
-            if line.startswith("c s exact arb"):
-                count = float(line.split()[-1])
-                if self.show_log:
-                    log_stat("Solver output", count)
-        if count is None:
+        times, counts = (_line_values(result,
+        "c o Total time [Arjun+GANAK]:"), _line_values(result,
+        "c s exact arb"))
+        if not counts:
             return SolverResult(False)
-        if time_taken is None:
-            time_taken = -1.0
+        count = counts[-1]
+        if self.show_log:
+            log_stat("Solver output", count)
+        if not times:
             if self.show_log:
                 log_warning("Ganak measured time not found")
-        return SolverResult(True, time_taken, count)
\ No newline at end of file
+            return SolverResult(True, -1.0, count)
+        return SolverResult(True, times[-1], count)
+
+def _line_values(output: str, prefix: str) -> list[float]:
+    """ Get the numbers at the end of all lines in the solver output that start
+        with the given prefix, in order. The output is searched with a single
+        regular expression instead of checking every line separately """
+    return [float(value) for value in re.findall(rf"^{re.escape(prefix)}.*?"
+    rf"(\S+)[^\S\n]*$", output, re.MULTILINE)]
+
+# Solver classes for each solver type, used by Solver.from_solver_name
+_SOLVER_CLASSES: dict[SolverType, type[Solver]] = {
+    "cachet": CachetSolver,
+    "dpmc": DPMCSolver,
+    "tensororder": TensorOrderSolver,
+    "ganak": GanakSolver,
+}
@@ -1,28 +1,32 @@
 
 from typing import Iterable, Mapping, Any, Iterator
-from itertools import chain
+import numpy as np
 from .boolvar import BoolVar, SignedBoolVar
 
 class CNF:
-    """ A conjunctive normal form formula of boolean variables """
+    """ A conjunctive normal form formula of boolean variables. Internally the
+        clauses are stored as a flat buffer of signed integer literals (+i/-i
+        referring to the i-th variable in the variable table) together with an
+        array of clause offsets """
 
     def __init__(self, clauses: Iterable[Iterable[SignedBoolVar | BoolVar]] |
     None = None):
         """ Constructor, given some list of clauses in the formula """
-        if clauses is None:
-            self._clauses = []
-        else:
-            self._clauses = [list(SignedBoolVar.from_var(var) for var in clause)
-            for clause in clauses]
+        self._vars: list[BoolVar] = []
+        self._var_index: dict[BoolVar, int] = {}
+        self._lits = np.zeros(0, dtype=np.int32)
+        self._offsets = np.zeros(1, dtype=np.int32)
+        if clauses is not None:
+            self.add_clause(*clauses)
 
     def __str__(self) -> str:
         """ String representation of the CNF formula """
         return "CNF(" + " ".join("(" + " ".join(str(x) for x in clause) + ")"
-        for clause in self._clauses) + ")"
+        for clause in self.clauses) + ")"
 
     def __repr__(self) -> str:
         """ Canonical representation """
-        return f"{self.__class__.__name__}({self._clauses!r})"
+        return f"{self.__class__.__name__}({list(self.clauses)!r})"
 
     def __eq__(self, other: Any) -> bool:
         """ Check if two CNF formulae are the same. The order of clauses and
@@ -30,17 +34,19 @@ class CNF:
             clauses should be the same """
         if not isinstance(other, CNF):
             return False
-        clauses = tuple(tuple(sorted(clause)) for clause in self._clauses)
-        other_clauses = tuple(tuple(sorted(clause)) for clause in other._clauses)
+        clauses = tuple(tuple(sorted(clause)) for clause in self.clauses)
+        other_clauses = tuple(tuple(sorted(clause)) for clause in other.clauses)
         return clauses == other_clauses
 
     def __and__(self, other: "CNF") -> "CNF":
         """ Returns the conjunction of two CNF formulae """
-        return CNF(chain(self._clauses, other._clauses))
+        cnf = self.copy()
+        cnf._extend(other)
+        return cnf
     
     def __add__(self, other: "CNF") -> "CNF":
         """ Returns the conjunction of two CNF formulae """
-        return CNF(chain(self._clauses, other._clauses))
+        return self & other
 
     def __call__(self, values: Mapping[BoolVar, bool]) -> bool:
         """ Check if this CNF formula evaluates to true given the variable
@@ -49,34 +55,156 @@ class CNF:
 
     def add_clause(self, *clauses: Iterable[SignedBoolVar | BoolVar]):
         """ Append or multiple clauses to the CNF formula """
+        lits: list[int] = []
+        offsets: list[int] = []
+        end = int(self._offsets[-1])
         for clause in clauses:
-            self._clauses.append([SignedBoolVar.from_var(var) for var in
-            clause])
+            for var in clause:
+                lits.append(self._literal(var))
+            offsets.append(end + len(lits))
+        if not offsets:
+            return
+        self._lits = np.concatenate((self._lits, np.array(lits,
+        dtype=np.int32)))
+        self._offsets = np.concatenate((self._offsets, np.array(offsets,
+        dtype=np.int32)))
+
+    def remove_redundant_clauses(self):
+        """ Remove duplicate clauses and clauses that are subsumed by (are a
+            superset of) another clause in the formula. The order of the
+            remaining clauses is preserved """
+        lits = self._lits.tolist()
+        offsets = self._offsets.tolist()
+        clauses = [tuple(sorted(set(lits[start:end]))) for start, end in
+        zip(offsets, offsets[1:])]
+        # Insert clauses from short to long in a trie keyed on sorted literals,
+        # skipping any clause that already has a subset in the trie
+        trie: dict = {}
+        keep = [False] * len(clauses)
+        for i in sorted(range(len(clauses)), key=lambda i: len(clauses[i])):
+            clause = clauses[i]
+            if _trie_has_subset(trie, clause, 0):
+                continue
+            keep[i] = True
+            node = trie
+            for lit in clause:
+                node = node.setdefault(lit, {})
+            node[None] = True
+        kept_lits: list[int] = []
+        kept_offsets = [0]
+        for i, (start, end) in enumerate(zip(offsets, offsets[1:])):
+            if keep[i]:
+                kept_lits += lits[start:end]
+                kept_offsets.append(len(kept_lits))
+        self._offsets = np.array(kept_offsets, dtype=np.int32)
+        # Drop variables that no longer occur in any clause and remap the
+        # remaining literals to the compacted variable table
+        used = sorted({abs(lit) for lit in kept_lits})
+        remap = np.zeros(len(self._vars) + 1, dtype=np.int32)
+        remap[used] = np.arange(1, len(used) + 1)
+        self._vars = [self._vars[i - 1] for i in used]
+        self._var_index = {var: i for i, var in enumerate(self._vars, 1)}
+        lits = np.array(kept_lits, dtype=np.int32)
+        self._lits = np.where(lits > 0, remap[lits], -remap[-lits]).astype(
+        np.int32)
 
     def subst(self, find: BoolVar, replace: BoolVar):
         """ Substitue all occurrences of the given variable in the CNF formula
             with another variable """
-        self._clauses = [[SignedBoolVar(replace, x.value) if x.var == find else
-        x for x in clause] for clause in self._clauses]
+        self.bulk_subst({find: replace})
 
     def bulk_subst(self, var_map: dict[BoolVar, BoolVar]):
         """ Bulk substitute variables. This also allows for substitutions like
             {x: y, y: x} """
-        self._clauses = [[SignedBoolVar(var_map[x.var], x.value) if x.var in
-        var_map else x for x in clause] for clause in self._clauses]
+        # Build the new variable table, merging variables that are mapped to
+        # the same target, and remap all literals in one go
+        variables: list[BoolVar] = []
+        var_index: dict[BoolVar, int] = {}
+        remap = np.zeros(len(self._vars) + 1, dtype=np.int32)
+        for i, var in enumerate(self._vars, 1):
+            var = var_map.get(var, var)
+            index = var_index.get(var)
+            if index is None:
+                variables.append(var)
+                index = var_index[var] = len(variables)
+            remap[i] = index
+        self._vars = variables
+        self._var_index = var_index
+        self._lits = np.where(self._lits > 0, remap[self._lits],
+        -remap[-self._lits]).astype(np.int32)
 
     def copy(self) -> "CNF":
         """ Copy this formula. Keep in mind that the variables are still the
             same, but the clauses can be edited independently """
-        return CNF(self._clauses)
+        cnf = CNF()
+        cnf._vars = self._vars.copy()
+        cnf._var_index = self._var_index.copy()
+        cnf._lits = np.copy(self._lits)
+        cnf._offsets = np.copy(self._offsets)
+        return cnf
     
     def truth_value(self, values: Mapping[BoolVar, bool]) -> bool:
         """ Check if this CNF formula evaluates to true given the variable
             assignments """
-        return all(any(var.value == values[var.var] for var in clause) for
-        clause in self._clauses)
+        if self.num_clauses == 0:
+            return True
+        if np.any(self._offsets[1:] == self._offsets[:-1]):
+            return False
+        # Only look up the variables that actually occur in some clause
+        indices = np.abs(self._lits)
+        used = np.unique(indices)
+        remap = np.zeros(len(self._vars) + 1, dtype=np.int32)
+        remap[used] = np.arange(len(used))
+        assignment = np.array([values[self._vars[i - 1]] for i in
+        used.tolist()], dtype=np.bool_)
+        sat = (self._lits > 0) == assignment[remap[indices]]
+        return bool(np.logical_or.reduceat(sat, self._offsets[:-1]).all())
     
     @property
     def clauses(self) -> Iterator[Iterable[SignedBoolVar]]:
         """ Iterate over all of the clauses of this CNF formula """
-        yield from self._clauses
\ No newline at end of file
+        lits = self._lits.tolist()
+        offsets = self._offsets.tolist()
+        for start, end in zip(offsets, offsets[1:]):
+            yield [SignedBoolVar(self._vars[abs(lit) - 1], lit > 0) for lit in
+            lits[start:end]]
+
+    @property
+    def num_clauses(self) -> int:
+        """ The number of clauses in the CNF formula """
+        return len(self._offsets) - 1
+
+    def _literal(self, var: SignedBoolVar | BoolVar) -> int:
+        """ Get the integer literal of a (signed) boolean variable, adding the
+            variable to the variable table if it is not in there yet """
+        if isinstance(var, BoolVar):
+            var, value = var, True
+        else:
+            var, value = var.var, var.value
+        index = self._var_index.get(var)
+        if index is None:
+            self._vars.append(var)
+            index = self._var_index[var] = len(self._vars)
+        return index if value else -index
+
+    def _extend(self, other: "CNF"):
+        """ Append all clauses of another CNF formula to this one """
+        remap = np.zeros(len(other._vars) + 1, dtype=np.int32)
+        for i, var in enumerate(other._vars, 1):
+            remap[i] = abs(self._literal(var))
+        lits = np.where(other._lits > 0, remap[other._lits],
+        -remap[-other._lits]).astype(np.int32)
+        self._lits = np.concatenate((self._lits, lits))
+        self._offsets = np.concatenate((self._offsets, other._offsets[1:] +
+        self._offsets[-1]))
+
+def _trie_has_subset(node: dict, clause: tuple[int, ...], start: int) -> bool:
+    """ Check if a trie of sorted clauses contains a clause that is a subset of
+        the given sorted clause, only considering literals from index start """
+    if None in node:
+        return True
+    for i in range(start, len(clause)):
+        child = node.get(clause[i])
+        if child is not None and _trie_has_subset(child, clause, i + 1):
+            return True
+    return False
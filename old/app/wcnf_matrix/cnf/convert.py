@@ -1,4 +1,4 @@
-
+import numpy as np
 from .cnf import CNF
 from .weights import WeightFunction
 from ...wcnf.formula import WeightedCNFFormula, CNFFormula, VariableWeights
@@ -8,13 +8,13 @@ WeightedCNFFormula):
     var_index = {var: i for i, var in enumerate(weight_func.domain, 1)}
     n = len(var_index)
     new_cnf = CNFFormula(n)
-    for clause in cnf._clauses:
-        cur = []
-        for var in clause:
-            cur.append(var_index[var.var] if var.value else -var_index[var.var])
-        new_cnf.clauses.append(cur)
+    remap = np.array([0] + [var_index[var] for var in cnf._vars],
+    dtype=np.int32)
+    lits = np.where(cnf._lits > 0, remap[cnf._lits], -remap[-cnf._lits])
+    for start, end in zip(cnf._offsets[:-1], cnf._offsets[1:]):
+        new_cnf.clauses.append(lits[start:end].tolist())
     new_weights = VariableWeights(n, weights={i: weight_func[var, True] for var,
     i in var_index.items()} | {-i: weight_func[var, False] for var, i in
     var_index.items()})
     return WeightedCNFFormula(len(var_index), formula=new_cnf,
-    weights=new_weights)
\ No newline at end of file
+    weights=new_weights)
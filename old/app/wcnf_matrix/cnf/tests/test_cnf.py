@@ -37,4 +37,15 @@ def test_bulk_subst():
     a, b, c, d = BoolVar(), BoolVar(), BoolVar(), BoolVar()
     cnf = CNF([[a, b], [c]])
     cnf.bulk_subst({a: b, b: c, c: a})
-    assert cnf == CNF([[c, b], [a]])
\ No newline at end of file
+    assert cnf == CNF([[c, b], [a]])
+
+def test_remove_redundant_clauses():
+    a, b, c = BoolVar(), BoolVar(), BoolVar()
+    cnf = CNF([[a, b], [b, a], [a, -c], [a], [b, c], [c, b, -a]])
+    cnf.remove_redundant_clauses()
+    assert cnf == CNF([[a], [b, c]])
+    assert cnf.truth_value({a: True, b: False, c: True})
+    cnf = CNF([[a], [a, b]])
+    cnf.remove_redundant_clauses()
+    assert cnf == CNF([[a]])
+    assert cnf.truth_value({a: True})
@@ -178,7 +178,7 @@ class WCNFMatrix(AbstractMatrix[float]):
     @classmethod
     def sum(cls, *matrices: Self) -> Self:
         """ Get the sum of multiple matrices and return the new matrix """
-        return cls.linear_comb(*matrices)
+        return cls._linear_comb(matrices)
 
     @classmethod
     def identity(cls, size: int) -> Self:
@@ -215,37 +215,49 @@ class WCNFMatrix(AbstractMatrix[float]):
         """ Get the representation of a linear combination of matrices. Each
             matrix can be given as a tuple (factor, matrix) or just the matrix
             itself, meaning factor = 1 """
-        matrices = tuple(mat if isinstance(mat, tuple) else (1.0, mat) for mat
-        in matrices)
-        matrices = tuple((factor, mat.copy()) for factor, mat in matrices)
+        factors = [mat[0] if isinstance(mat, tuple) else 1.0 for mat in
+        matrices]
+        return cls._linear_comb([mat[1] if isinstance(mat, tuple) else mat for
+        mat in matrices], factors)
+
+    @classmethod
+    def _linear_comb(cls, matrices: Iterable[Self], factors: list[float] | None
+    = None) -> Self:
+        """ Get the representation of a linear combination of matrices, given
+            the matrices and their factors. If no factors are given, all
+            factors are 1 """
+        matrices = [mat.copy() for mat in matrices]
         if len(matrices) <= 0:
             raise ValueError("Cannot determine linear combination of zero "
             "matrices")
-        if not all(mat.shape == matrices[0][1].shape for _, mat in matrices):
+        if factors is None:
+            factors = [1.0] * len(matrices)
+        if not all(mat.shape == matrices[0].shape for mat in matrices):
             raise ValueError("Not all matrices in the linear combination have "
             "the same shape")
-        for (_, mat_a), (_, mat_b) in zip(matrices, matrices[1:]):
+        for mat_a, mat_b in zip(matrices, matrices[1:]):
             mat_b.bulk_subst({i: o for i, o in zip(mat_b._input_vars,
             mat_a._output_vars)})
         condition_var = BoolVar()
-        cnf = reduce(lambda x, y: x & y, (mat._cnf for _, mat in matrices))
-        cnf.add_clause(*([condition_var, -mat._condition_var] for _, mat in
+        cnf = reduce(lambda x, y: x & y, (mat._cnf for mat in matrices))
+        cnf.add_clause(*([condition_var, -mat._condition_var] for mat in
         matrices))
-        cnf.add_clause([-condition_var, *(mat._condition_var for _, mat in
+        cnf.add_clause([-condition_var, *(mat._condition_var for mat in
         matrices)])
-        for i, (_, mat_a) in enumerate(matrices):
-            for _, mat_b in matrices[i + 1:]:
+        for i, mat_a in enumerate(matrices):
+            for mat_b in matrices[i + 1:]:
                 cnf.add_clause([-condition_var, -mat_a._condition_var,
                 -mat_b._condition_var])
-        weight_func = matrices[0][1]._weight_func
-        for _, mat in matrices[1:]:
+        cnf.remove_redundant_clauses()
+        weight_func = matrices[0]._weight_func
+        for mat in matrices[1:]:
             weight_func *= mat._weight_func
         weight_func *= WeightFunction([condition_var], weights={condition_var:
         (1.0, 1.0)})
-        for factor, mat in matrices:
+        for factor, mat in zip(factors, matrices):
             weight_func[mat._condition_var, True] = factor
-        matrix = WCNFMatrix(cnf, weight_func, matrices[0][1]._input_vars,
-        matrices[-1][1]._output_vars, condition_var)
+        matrix = WCNFMatrix(cnf, weight_func, matrices[0]._input_vars,
+        matrices[-1]._output_vars, condition_var)
         return matrix
 
     def _check_valid(self):
@@ -1,9 +1,81 @@
 
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from threading import Lock
 import docker
+from docker.errors import APIError, ImageNotFound
 import os
 import setuptools
+import subprocess
 
-RUNNER_VERSION = "1.8"
+RUNNER_VERSION = "1.9"
+# Registry from which prebuilt solver images are pulled. The images are only
+# built locally if they cannot be pulled. Set to an empty string to always build
+IMAGE_REGISTRY = os.environ.get("WCNF_MATRIX_IMAGE_REGISTRY",
+"ghcr.io/system-verification-lab")
+# Registry repository used as BuildKit layer cache for the solver images, e.g.
+# "ghcr.io/user/wcnf-matrix-cache". If not set, a local cache directory is used
+BUILD_CACHE_REGISTRY = os.environ.get("WCNF_MATRIX_BUILD_CACHE")
+LOCAL_BUILD_CACHE = os.path.join(os.path.dirname(__file__), ".buildx-cache")
+# Name of the buildx builder, which needs the docker-container driver to be
+# able to export caches
+BUILDER_NAME = "wcnf-matrix"
+# The solver images are built concurrently, but the builder is only looked up
+# and created once. Without a lock, every thread would see that it does not
+# exist yet
+BUILDER_LOCK = Lock()
+
+def pull_image(client: docker.DockerClient, tag: str) -> bool:
+    """ Try to pull a prebuilt image from the image registry and tag it
+        locally with the given tag. Returns if this succeeded """
+    if not IMAGE_REGISTRY:
+        return False
+    name, version = tag.split(":")
+    try:
+        image = client.images.pull(f"{IMAGE_REGISTRY}/{name}", tag=version)
+    except APIError:
+        return False
+    return image.tag(name, version)
+
+@cache
+def buildx_available() -> bool:
+    """ Check if the buildx builder can be used, creating it if it does not
+        exist yet. Returns False if the docker CLI or its buildx plugin is
+        missing, or if the builder cannot be created """
+    env = {**os.environ, "DOCKER_BUILDKIT": "1"}
+    try:
+        if subprocess.call(["docker", "buildx", "inspect", BUILDER_NAME],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL) != 0:
+            subprocess.check_call(["docker", "buildx", "create", "--name",
+            BUILDER_NAME, "--driver", "docker-container"], env=env)
+    except (OSError, subprocess.CalledProcessError):
+        return False
+    return True
+
+def build_image(client: docker.DockerClient, tag: str, docker_build_path: str):
+    """ Build a Docker image with BuildKit, importing and exporting the layer
+        cache such that unchanged layers are reused between environments. The
+        cache is keyed by the image tag, which includes the runner version. If
+        buildx cannot be used, the image is built without the layer cache """
+    with BUILDER_LOCK:
+        use_buildx = buildx_available()
+    if not use_buildx:
+        print(f"Docker buildx is not available, building {tag} without layer "
+        "cache")
+        client.images.build(path=docker_build_path, tag=tag)
+        return
+    env = {**os.environ, "DOCKER_BUILDKIT": "1"}
+    if BUILD_CACHE_REGISTRY is None:
+        cache_dir = os.path.join(LOCAL_BUILD_CACHE, tag.replace(":", "-"))
+        cache_from = f"type=local,src={cache_dir}"
+        cache_to = f"type=local,dest={cache_dir},mode=max"
+    else:
+        cache_ref = f"{BUILD_CACHE_REGISTRY}:{tag.replace(':', '-')}"
+        cache_from = f"type=registry,ref={cache_ref}"
+        cache_to = f"type=registry,ref={cache_ref},mode=max"
+    subprocess.check_call(["docker", "buildx", "build", "--builder",
+    BUILDER_NAME, f"--cache-from={cache_from}", f"--cache-to={cache_to}",
+    "--load", "-t", tag, docker_build_path], env=env)
 
 def install_dpmc():
     """ Install the DPMC solver using Docker """
@@ -13,10 +85,11 @@ def install_dpmc():
     client = docker.from_env()
     tag = f"dpmc:{RUNNER_VERSION}"
     try:
-        client.images.get(tag)
+        client.api.inspect_image(tag)
         print("DPMC already installed!")
-    except:
-        client.images.build(path=docker_build_path, tag=tag)
+    except ImageNotFound:
+        if not pull_image(client, tag):
+            build_image(client, tag, docker_build_path)
 
 def install_cachet():
     """ Install the Cachet solver using Docker """
@@ -26,10 +99,11 @@ def install_cachet():
     client = docker.from_env()
     tag = f"cachet:{RUNNER_VERSION}"
     try:
-        client.images.get(f"{tag}")
+        client.api.inspect_image(tag)
         print("Cachet already installed!")
-    except:
-        client.images.build(path=docker_build_path, tag=tag)
+    except ImageNotFound:
+        if not pull_image(client, tag):
+            build_image(client, tag, docker_build_path)
 
 def install_tensororder():
     """ Install the TensorOrder solver using Docker """
@@ -39,12 +113,17 @@ def install_tensororder():
     client = docker.from_env()
     tag = f"tensororder:{RUNNER_VERSION}"
     try:
-        client.images.get(f"{tag}")
+        client.api.inspect_image(tag)
         print("TensorOrder already installed!")
-    except:
-        client.images.build(path=docker_build_path, tag=tag)
+    except ImageNotFound:
+        if not pull_image(client, tag):
+            build_image(client, tag, docker_build_path)
 
-install_dpmc()
-install_cachet()
-install_tensororder()
+# The solver images are independent, so they are built concurrently. Getting
+# the results propagates any exception raised during installation
+with ThreadPoolExecutor(max_workers=3) as executor:
+    futures = [executor.submit(install) for install in (install_dpmc,
+    install_cachet, install_tensororder)]
+    for future in futures:
+        future.result()
 setuptools.setup()
\ No newline at end of file
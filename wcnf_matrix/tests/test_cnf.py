@@ -26,6 +26,11 @@ def test_inner_clause_order():
     a, b = BoolVar(), BoolVar()
     assert CNF([[a, b]]) == CNF([[b, a]])
 
+def test_clause_order():
+    a, b, c = BoolVar(), BoolVar(), BoolVar()
+    assert CNF([[a, -b], [c]]) == CNF([[c], [-b, a]])
+    assert CNF([[a], [-a]]) != CNF([[-a], [-a]])
+
 def test_subst():
     a, b = BoolVar(), BoolVar()
     cnf = CNF([[a]])
@@ -36,4 +41,12 @@ def test_bulk_subst():
     a, b, c, d = BoolVar(), BoolVar(), BoolVar(), BoolVar()
     cnf = CNF([[a, b], [c]])
     cnf.bulk_subst({a: b, b: c, c: a})
-    assert cnf == CNF([[c, b], [a]])
\ No newline at end of file
+    assert cnf == CNF([[c, b], [a]])
+
+def test_dimacs_clauses():
+    a, b = BoolVar(), BoolVar()
+    cnf = CNF([[a, -b], [b]])
+    assert cnf.dimacs_clauses([a, b]) == "1 -2 0\n2 0"
+    assert cnf.dimacs_clauses([b, a]) == "2 -1 0\n1 0"
+    cnf.subst(b, a)
+    assert cnf.dimacs_clauses([b, a]) == "2 -2 0\n2 0"
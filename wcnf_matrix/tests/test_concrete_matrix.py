@@ -1,5 +1,6 @@
 
 from wcnf_matrix import Index, ConcreteMatrix
+import pytest
 
 def test_bra_ket_mul():
     T = Index()
@@ -59,4 +60,41 @@ def test_permutation_id():
         [2, 2, 0, 0],
         [0, 0, 2, 2],
         [0, 0, 2, 2],
-    ])
\ No newline at end of file
+    ])
+
+def test_kron_non_square():
+    T = Index()
+    assert ConcreteMatrix(T, [[1, 2]]) ** ConcreteMatrix(T, [[1], [3]]) == (
+    ConcreteMatrix(T, [[1, 2], [3, 6]]))
+
+def test_linear_comb():
+    T = Index(field=complex)
+    A = ConcreteMatrix(T, [[1, 2], [3, 4]])
+    B = ConcreteMatrix(T, [[0, 1j], [1, 0]])
+    assert ConcreteMatrix.linear_comb((2, A), B, (-1j, B)) == ConcreteMatrix(T,
+    [[2, 5 + 1j], [7 - 1j, 8]])
+
+def test_product_chain():
+    T = Index()
+    A = ConcreteMatrix(T, [[1, 2], [3, 4]])
+    B = ConcreteMatrix(T, [[0, 1], [1, 0]])
+    assert ConcreteMatrix.product(ConcreteMatrix.bra(T[0]), A, B, A,
+    ConcreteMatrix.ket(T[1])) == ConcreteMatrix(T, [[8]])
+
+def test_add_sub():
+    T = Index()
+    A = ConcreteMatrix(T, [[1, 2], [3, 4]])
+    B = ConcreteMatrix(T, [[0, 1], [1, 0]])
+    assert A + B == ConcreteMatrix(T, [[1, 3], [4, 4]])
+    assert A - B == ConcreteMatrix(T, [[1, 1], [2, 4]])
+    with pytest.raises(ValueError):
+        _ = A - ConcreteMatrix(T, [[1, 2]])
+
+def test_linear_comb_promotes():
+    T = Index()
+    A = ConcreteMatrix(T, [[1, 2]])
+    assert ConcreteMatrix.linear_comb((1j, A))[0, 1] == 2j
+
+def test_getitem_python_scalar():
+    T = Index()
+    assert type(ConcreteMatrix(T, [[1, 2]])[0, 1]) is float
@@ -30,4 +30,13 @@ def test_basis_neq_other_type():
 def test_uset():
     T = Index()
     for i, elt in zip(range(T.q), uset(T)):
-        assert T[i] == elt
\ No newline at end of file
+        assert T[i] == elt
+
+def test_basis_shared():
+    T = Index(3)
+    assert T[2] is T[2]
+    assert list(uset(T)) == [T[0], T[1], T[2]]
+
+def test_basis_hash():
+    T1, T2 = Index(), Index()
+    assert len({T1[0], T1[0], T1[1], T2[0]}) == 3
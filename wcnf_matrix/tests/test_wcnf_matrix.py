@@ -4,11 +4,20 @@ WeightFunction, BoolVar, get_var_rep_type)
 from itertools import product
 import pytest
 
+@pytest.fixture(scope="module")
+def T5() -> Index:
+    return Index(5)
+
+@pytest.fixture(scope="module")
+def bra_ket_truth(T5: Index) -> dict[tuple[int, int], ConcreteMatrix]:
+    return {(i, j): ConcreteMatrix.bra(T5[i]) * ConcreteMatrix.ket(T5[j])
+    for i, j in product(range(5), repeat=2)}
+
 @pytest.mark.parametrize("values", list(product(range(5), repeat=2)))
-def test_bra_ket(values: tuple[int, int]):
-    T = Index(5)
-    assert (ConcreteMatrix.bra(T[values[0]]) * ConcreteMatrix.ket(T[values[1]])
-    == value(WCNFMatrix.bra(T[values[0]]) * WCNFMatrix.ket(T[values[1]])))
+def test_bra_ket(values: tuple[int, int], T5: Index,
+bra_ket_truth: dict[tuple[int, int], ConcreteMatrix]):
+    assert bra_ket_truth[values] == value(WCNFMatrix.bra(T5[values[0]]) *
+    WCNFMatrix.ket(T5[values[1]]))
 
 def test_pauli_x():
     var_rep = get_var_rep_type()
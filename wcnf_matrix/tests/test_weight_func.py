@@ -39,3 +39,9 @@ def test_bulk_subst_and_combine():
     g.bulk_subst({z: y})
     h = f.combine(g, lambda a, b: a * b)
     assert h[y, True] == approx(10.0)
+
+def test_get_weights():
+    x, y = BoolVar(), BoolVar()
+    f = WeightFunction([x, y], weights={x: (1.0, 2.0)})
+    f[y, False] = 3.0
+    assert f.get_weights([y, x]) == ([3.0, 1.0], [None, 2.0])
@@ -1,6 +1,6 @@
 
 from .boolvar import BoolVar, SignedBoolVar
-from .cnf import CNF
+from .cnf import CNF, CompiledCNF
 from .weights import WeightFunction
 from .model_counter import (ModelCounter, ModelCounterResult, set_model_counter,
 DPMC, Cachet, TensorOrder)
\ No newline at end of file
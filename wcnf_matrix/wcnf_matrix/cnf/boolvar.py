@@ -1,16 +1,36 @@
 
 from typing import Any
+from weakref import WeakValueDictionary
 
 name_index = 1
 
 class SignedBoolVar:
-    """ A boolean variable or its negation """
+    """ A boolean variable or its negation. Signed boolean variables are
+        immutable and interned, so there is at most one instance for every
+        combination of variable and sign """
 
-    def __init__(self, var: "BoolVar", value: bool = True):
+    # Existing instances, by variable ID and sign. Entries keep their variable
+    # alive, so the variable ID cannot be reused while the entry exists
+    _cache: WeakValueDictionary[tuple[int, bool], "SignedBoolVar"] = (
+    WeakValueDictionary())
+
+    def __new__(cls, var: "BoolVar", value: bool = True) -> "SignedBoolVar":
         """ Constructor, given the boolean variable to turn into a signed
             boolean variable, and wether to negate the variable """
-        self._var = var
-        self._value = value
+        value = bool(value)
+        key = (id(var), value)
+        self = cls._cache.get(key)
+        if self is None:
+            self = super().__new__(cls)
+            self._var = var
+            self._value = value
+            cls._cache[key] = self
+        return self
+
+    def __getnewargs__(self) -> tuple["BoolVar", bool]:
+        """ Arguments to recreate this object with when unpickling, so that
+            unpickled objects are interned as well """
+        return self._var, self._value
 
     def __str__(self) -> str:
         """ String representation is the name of the variable, with a "-" in
@@ -31,13 +51,16 @@ class SignedBoolVar:
         return self.copy()
     
     def __eq__(self, other: Any) -> bool:
-        """ Check if this signed boolean variable is equal to another """
-        if not isinstance(other, SignedBoolVar):
-            return False
-        return self._var == other._var and self._value == other._value
+        """ Check if this signed boolean variable is equal to another. Since
+            instances are interned, this is an identity check """
+        return self is other
 
     def __ne__(self, other: Any) -> bool:
-        return not (self == other)
+        return self is not other
+
+    def __hash__(self) -> int:
+        """ Hash of the underlying variable and sign """
+        return hash((self._var, self._value))
 
     def __lt__(self, other: "SignedBoolVar") -> bool:
         """ Comparison operator between the two underlying variables """
@@ -56,9 +79,9 @@ class SignedBoolVar:
         return self._var >= other._var
 
     def copy(self) -> "SignedBoolVar":
-        """ Create a copy of this object, without changing the variable referred
-            to """
-        return SignedBoolVar(self._var, self._value)
+        """ Returns this object, since signed boolean variables are immutable
+            """
+        return self
 
     @property
     def var(self) -> "BoolVar":
@@ -72,11 +95,11 @@ class SignedBoolVar:
 
     @classmethod
     def from_var(self, var: "BoolVar | SignedBoolVar") -> "SignedBoolVar":
-        """ Convert a boolean variable or signed boolean variable to a new
-            signed boolean variable """
+        """ Convert a boolean variable or signed boolean variable to a signed
+            boolean variable """
         if isinstance(var, BoolVar):
             return SignedBoolVar(var)
-        return var.copy()
+        return var
 
 class BoolVar:
     """ A boolean variable """
@@ -144,6 +167,6 @@ class BoolVar:
             signed boolean variable with positive sign """
         return SignedBoolVar(self, True)
 
-    def __hash__(self) -> int:
-        """ The hash of a boolean variable is the ID of the object """
-        return id(self)
\ No newline at end of file
+    # Boolean variables are hashed by identity, using the C implementation of
+    # object so that hashing does not call back into Python
+    __hash__ = object.__hash__
\ No newline at end of file
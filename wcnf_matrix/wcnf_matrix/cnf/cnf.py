@@ -1,6 +1,6 @@
 
-from typing import Iterable, Mapping, Any, Iterator
-from itertools import chain, product
+from typing import Iterable, Mapping, Any, Iterator, Sequence
+from collections import Counter
 from .boolvar import BoolVar, SignedBoolVar
 
 class CNF:
@@ -9,11 +9,17 @@ class CNF:
     def __init__(self, clauses: Iterable[Iterable[SignedBoolVar | BoolVar]] |
     None = None):
         """ Constructor, given some list of clauses in the formula """
+        # Multiset of clauses as sets of literals, see _canonical_form()
+        self._canonical: Counter[frozenset[SignedBoolVar]] | None = None
+        # Compiled form used by truth_value, see compile()
+        self._compiled: CompiledCNF | None = None
+        # IDs of the variables and the clause lines, see dimacs_clauses()
+        self._dimacs: tuple[tuple[int, ...], str] | None = None
         if clauses is None:
             self._clauses = []
         else:
-            self._clauses = [list(SignedBoolVar.from_var(var) for var in clause)
-            for clause in clauses]
+            self._clauses = [[_lift(var) for var in clause] for clause in
+            clauses]
 
     def __str__(self) -> str:
         """ String representation of the CNF formula """
@@ -30,23 +36,24 @@ class CNF:
             clauses should be the same """
         if not isinstance(other, CNF):
             return False
-        clauses = tuple(tuple(sorted(clause)) for clause in self._clauses)
-        other_clauses = tuple(tuple(sorted(clause)) for clause in other._clauses)
-        return clauses == other_clauses
+        if len(self._clauses) != len(other._clauses):
+            return False
+        return self._canonical_form() == other._canonical_form()
 
     def __and__(self, other: "CNF") -> "CNF":
         """ Returns the conjunction of two CNF formulae """
-        return CNF(chain(self._clauses, other._clauses))
+        return CNF._from_normalized(self._clauses + other._clauses)
     
     def __or__(self, other: "CNF") -> "CNF":
         """ Returns the disjunction of two CNF formulae. The number clauses will
             be the product of the number of clauses in the two separate formulae
             """
-        return CNF(a + b for a, b in product(self._clauses, other._clauses))
+        return CNF._from_normalized([a + b for a in self._clauses for b in
+        other._clauses])
 
     def __add__(self, other: "CNF") -> "CNF":
         """ Returns the conjunction of two CNF formulae """
-        return CNF(chain(self._clauses, other._clauses))
+        return CNF._from_normalized(self._clauses + other._clauses)
 
     def __call__(self, values: Mapping[BoolVar, bool]) -> bool:
         """ Check if this CNF formula evaluates to true given the variable
@@ -55,33 +62,87 @@ class CNF:
 
     def add_clause(self, *clauses: Iterable[SignedBoolVar | BoolVar]):
         """ Append or multiple clauses to the CNF formula """
-        for clause in clauses:
-            self._clauses.append([SignedBoolVar.from_var(var) for var in
-            clause])
+        self._invalidate()
+        self._clauses.extend([[_lift(var) for var in clause] for clause in
+        clauses])
 
     def subst(self, find: BoolVar, replace: BoolVar):
         """ Substitue all occurrences of the given variable in the CNF formula
             with another variable """
-        self._clauses = [[SignedBoolVar(replace, x.value) if x.var == find else
+        self._invalidate()
+        self._clauses = [[SignedBoolVar(replace, x.value) if x.var is find else
         x for x in clause] for clause in self._clauses]
 
     def bulk_subst(self, var_map: dict[BoolVar, BoolVar]):
         """ Bulk substitute variables. This also allows for substitutions like
             {x: y, y: x} """
+        self._invalidate()
         self._clauses = [[SignedBoolVar(var_map[x.var], x.value) if x.var in
         var_map else x for x in clause] for clause in self._clauses]
 
     def copy(self) -> "CNF":
         """ Copy this formula. Keep in mind that the variables are still the
             same, but the clauses can be edited independently """
-        return CNF(self._clauses)
+        return CNF._from_normalized([clause.copy() for clause in
+        self._clauses])
     
     def truth_value(self, values: Mapping[BoolVar, bool]) -> bool:
         """ Check if this CNF formula evaluates to true given the variable
             assignments """
-        return all(any(var.value == values[var.var] for var in clause) for
-        clause in self._clauses)
+        compiled = self._compiled
+        if compiled is None or compiled.variables.keys() != values.keys():
+            compiled = self._compiled = self.compile(list(values))
+        return compiled.truth_value(compiled.assignment_mask(values))
+
+    def dimacs_clauses(self, variables: Sequence[BoolVar]) -> str:
+        """ Get the clauses of this formula as DIMACS lines, given the variables
+            in the order they are numbered, starting at 1. All variables in the
+            formula should be in the given sequence. The result is cached until
+            the formula is changed or the variables differ, such that the same
+            formula with different weights is only formatted once """
+        key = tuple(map(id, variables))
+        if self._dimacs is not None and self._dimacs[0] == key:
+            return self._dimacs[1]
+        # Formatted number of every variable by ID, since IDs are hashed without
+        # calling back into Python
+        var_index = {var_id: str(i) for i, var_id in enumerate(key, 1)}
+        signs = ("-", "")
+        text = "\n".join(" ".join([*(signs[x.value] + var_index[id(x.var)] for
+        x in clause), "0"]) for clause in self._clauses)
+        self._dimacs = (key, text)
+        return text
+
+    def compile(self, variables: Sequence[BoolVar]) -> "CompiledCNF":
+        """ Compile this formula to bitmasks for fast repeated evaluation, given
+            the variables that assignments are made to. All variables in the
+            formula should be in the given sequence """
+        return CompiledCNF(self, variables)
     
+    def _invalidate(self):
+        """ Clear cached forms of this formula, after it has been changed """
+        self._canonical = None
+        self._compiled = None
+        self._dimacs = None
+
+    @classmethod
+    def _from_normalized(cls, clauses: list[list[SignedBoolVar]]) -> "CNF":
+        """ Create a CNF formula from a list of clauses that only contain
+            signed boolean variables, without converting or copying them. Note
+            that clause lists are never modified in place, so they can be
+            shared between formulae """
+        cnf = cls()
+        cnf._clauses = clauses
+        return cnf
+
+    def _canonical_form(self) -> Counter[frozenset[SignedBoolVar]]:
+        """ Get the multiset of clauses, where every clause is a set of signed
+            variables, such that the order of clauses and terms does not
+            matter. The result is cached until the formula is changed """
+        if self._canonical is None:
+            self._canonical = Counter(frozenset(clause) for clause in
+            self._clauses)
+        return self._canonical
+
     @property
     def clauses(self) -> Iterator[Iterable[SignedBoolVar]]:
         """ Iterate over all of the clauses of this CNF formula """
@@ -90,4 +151,40 @@ class CNF:
     @property
     def num_clauses(self) -> int:
         """ Get the number of clauses of this formula """
-        return len(self._clauses)
\ No newline at end of file
+        return len(self._clauses)
+
+class CompiledCNF:
+    """ A CNF formula compiled to a pair of bitmasks per clause, containing the
+        variables that occur positively and negatively in the clause """
+
+    def __init__(self, cnf: CNF, variables: Sequence[BoolVar]):
+        """ Constructor, given the formula and the variables that assignments
+            are made to. Bit i corresponds with the i-th variable """
+        self.variables = {var: 1 << i for i, var in enumerate(variables)}
+        self._masks: list[tuple[int, int]] = []
+        for clause in cnf.clauses:
+            pos = neg = 0
+            for x in clause:
+                if x.value:
+                    pos |= self.variables[x.var]
+                else:
+                    neg |= self.variables[x.var]
+            self._masks.append((pos, neg))
+
+    def assignment_mask(self, values: Mapping[BoolVar, bool]) -> int:
+        """ Convert an assignment of the variables to a bitmask """
+        return sum(self.variables[var] for var, value in values.items() if
+        value)
+
+    def truth_value(self, assignment_mask: int) -> bool:
+        """ Check if the formula evaluates to true given an assignment bitmask
+            """
+        inverted = ~assignment_mask
+        return all((assignment_mask & pos) | (inverted & neg) for pos, neg in
+        self._masks)
+
+def _lift(var: SignedBoolVar | BoolVar) -> SignedBoolVar:
+    """ Convert a boolean variable to a signed boolean variable. Signed boolean
+        variables are immutable, so these are returned as-is instead of being
+        copied """
+    return var if type(var) is SignedBoolVar else SignedBoolVar.from_var(var)
@@ -1,24 +1,36 @@
 
-import docker
-from docker.errors import NotFound
 from typing import Iterator
 from .model_counter import ModelCounter, ModelCounterResult
 from ..cnf import CNF
 from ..weights import WeightFunction
 from .formats import format_cachet
 import json
-from subprocess import Popen, PIPE
+import os
+from concurrent.futures import ThreadPoolExecutor
+from subprocess import TimeoutExpired
 from .config import RUNNER_VERSION
+from .container import SolverContainer, image_available
 
 PROCESS_TIMEOUT = 30
+# Result of a problem that could not be solved, in the format of the JSON
+# objects returned by the solver
+FAILED_RESULT = {"prob": None, "runtime": -1.0}
 
 class Cachet(ModelCounter):
     """ Interface to the Cachet model counter, which requires a docker image
         called "cachet" to be present """
 
-    def __init__(self):
-        """ Constructor """
-        self._client = docker.from_env()
+    def __init__(self, *, pool_size: int | None = None):
+        """ Constructor. Optionally the maximum number of containers that solve
+            problems in parallel can be given, which defaults to the number of
+            CPUs """
+        # Long-running containers that each solve a shard of every batch
+        self._containers = [SolverContainer(f"cachet:{RUNNER_VERSION}",
+        PROCESS_TIMEOUT) for _ in range(pool_size or os.cpu_count() or 1)]
+
+    def __del__(self):
+        """ Destructor, which stops the long-running containers """
+        self.close()
 
     def model_count(self, cnf: CNF, weight_func: WeightFunction) -> (
     ModelCounterResult):
@@ -28,48 +40,77 @@ class Cachet(ModelCounter):
 
     def batch_model_count(self, *problems: tuple[CNF, WeightFunction]) -> (
     Iterator[ModelCounterResult]):
-        problems, factors = self._normalize_problems(*problems)
         try:
-            problem_strings = [format_cachet(cnf, wf) for cnf, wf in problems]
-            problems_json = json.dumps({"problems": problem_strings})
-            process = Popen(["docker", "run", "-i", "--rm",
-            f"cachet:{RUNNER_VERSION}", "python", "run_solver.py"], stdin=PIPE,
-            stdout=PIPE)
-            output, _ = process.communicate(input=problems_json.encode(),
-            timeout=PROCESS_TIMEOUT)
+            problem_strings, factors = self._prepare_problems(*problems)
+            # Split the problems into contiguous shards, one per container,
+            # such that concatenating the results preserves the order
+            shard_count = max(1, min(len(self._containers),
+            len(problem_strings)))
+            bounds = [len(problem_strings) * i // shard_count for i in
+            range(shard_count + 1)]
+            with ThreadPoolExecutor(max_workers=shard_count) as executor:
+                shards = list(executor.map(self._solve_shard,
+                range(shard_count), (problem_strings[start:stop] for start,
+                stop in zip(bounds[:-1], bounds[1:]))))
         except:
             for _ in problems:
                 yield ModelCounterResult(False)
-        results = json.loads(output.decode())
-        for result, factor in zip(results["results"], factors):
-            model_count = None
-            runtime = -1.0
-            for line in result.split("\n"):
-                if line.startswith("Satisfying probability"):
-                    model_count = float(line.split()[-1]) * factor
-                if line.startswith("RUNTIME:"):
-                    runtime = float(line.split()[-1])
-            yield ModelCounterResult(model_count is not None, runtime,
-            model_count)
+            return
+        results = [result for shard in shards for result in shard]
+        for result, factor in zip(results, factors):
+            if result["prob"] is None:
+                yield ModelCounterResult(False, result["runtime"])
+            else:
+                yield ModelCounterResult(True, result["runtime"],
+                result["prob"] * factor)
+
+    def close(self):
+        """ Stop the long-running containers that are running. New containers
+            are started when problems are solved again """
+        for container in getattr(self, "_containers", []):
+            container.close()
 
     def is_available(self) -> bool:
         """ Returns if Cachet is available """
-        try:
-            self._client.images.get("cachet:latest")
-        except NotFound:
-            return False
-        return True
+        return image_available(f"cachet:{RUNNER_VERSION}")
     
-    def _normalize_problems(self, *problems: tuple[CNF, WeightFunction]) -> (
-    tuple[list[tuple[CNF, WeightFunction]], list[float]]):
-        """ Normalize the weight functions of the given problems, and return a
-            list of the new problems and a list of factors, with which the model
-            counts of the new problems need to be multiplied to get the model
-            counts of the original problems """
-        new_problems = []
-        factors = []
-        for cnf, wf in problems:
-            wf = wf.copy()
-            factors.append(wf.normalize())
-            new_problems.append((cnf, wf))
-        return new_problems, factors
\ No newline at end of file
+    def _solve_shard(self, slot: int, problem_strings: list[str]) -> (
+    list[dict]):
+        """ Solve a shard of formatted problems using the long-running container
+            in the given slot and return the solver result of every problem """
+        container = self._containers[slot]
+        try:
+            try:
+                results = container.solve(problem_strings)
+            except (OSError, RuntimeError):
+                # The container is stopped when it fails, so the shard is tried
+                # once more in a new container
+                results = container.solve(problem_strings)
+        except TimeoutExpired:
+            if len(problem_strings) <= 1:
+                return [FAILED_RESULT] * len(problem_strings)
+            # Split the shard in halves, such that only the problems that time
+            # out by themselves fail
+            middle = len(problem_strings) // 2
+            return (self._solve_shard(slot, problem_strings[:middle]) +
+            self._solve_shard(slot, problem_strings[middle:]))
+        return [json.loads(result) for result in results]
+
+    def _prepare_problems(self, *problems: tuple[CNF, WeightFunction]) -> (
+    tuple[list[str], list[float]]):
+        """ Normalize the weight functions of the given problems and format
+            them for Cachet. Returns a list of the formatted problems and a list
+            of factors, with which the model counts of the formatted problems
+            need to be multiplied to get the model counts of the original
+            problems """
+        prepared = list(map(_prepare_problem, problems))
+        return [text for text, _ in prepared], [factor for _, factor in
+        prepared]
+
+def _prepare_problem(problem: tuple[CNF, WeightFunction]) -> tuple[str, float]:
+    """ Normalize the weight function of a problem and format it for Cachet.
+        Returns the formatted problem and the normalization factor """
+    cnf, wf = problem
+    wf = wf.copy()
+    factor = wf.normalize()
+    return format_cachet(cnf, wf), factor
\ No newline at end of file
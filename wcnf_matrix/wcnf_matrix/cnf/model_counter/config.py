@@ -1,2 +1,2 @@
 
-RUNNER_VERSION = "1.8"
\ No newline at end of file
+RUNNER_VERSION = "1.9"
\ No newline at end of file
@@ -0,0 +1,133 @@
+
+import docker
+from docker.errors import ImageNotFound
+from functools import cache
+from select import select
+from subprocess import Popen, PIPE, TimeoutExpired
+from time import monotonic
+from typing import Sequence
+import os
+import struct
+
+@cache
+def docker_client() -> docker.DockerClient:
+    """ Get the Docker client shared by all model counters, which is created
+        on first use """
+    return docker.from_env()
+
+@cache
+def image_available(image: str) -> bool:
+    """ Returns if the given Docker image is present. The result is cached until
+        refresh_images() is called """
+    try:
+        docker_client().api.inspect_image(image)
+    except ImageNotFound:
+        return False
+    return True
+
+def refresh_images():
+    """ Clear the cached results of image_available(), e.g. after installing a
+        solver image """
+    image_available.cache_clear()
+
+def frame_strings(strings: Sequence[str | bytes]) -> list[bytes]:
+    """ Encode a list of strings, or of UTF-8 encoded bytes, as the number of
+        strings followed by every string prefixed with its length, where all
+        integers are 4-byte big-endian. The parts of the frame are returned
+        separately, such that the strings are not copied into a single buffer
+        """
+    frame = [struct.pack(">I", len(strings))]
+    for string in strings:
+        data = string.encode() if isinstance(string, str) else string
+        frame += (struct.pack(">I", len(data)), data)
+    return frame
+
+class SolverContainer:
+    """ A long-running Docker container of a solver image, which solves batches
+        of problems sent over its stdin. The container is started when the
+        first batch is solved """
+
+    def __init__(self, image: str, timeout: float):
+        """ Constructor, given the name of the solver image and the maximum
+            number of seconds that solving a batch may take """
+        self._image = image
+        self._timeout = timeout
+        self._process: Popen | None = None
+
+    def __del__(self):
+        """ Destructor, which stops the container """
+        self.close()
+
+    def solve(self, problems: Sequence[str | bytes]) -> list[str]:
+        """ Solve a batch of formatted problems, given as strings or as UTF-8
+            encoded bytes, and return the solver output of every problem.
+            Batches and results are sent in the format of frame_strings().
+            Raises TimeoutExpired if starting the container, sending the batch
+            and solving it take longer than the timeout together, and
+            RuntimeError if the container exits. In both cases the container is stopped, and
+            restarted for the next batch """
+        deadline = monotonic() + self._timeout
+        process = self._process
+        if process is None or process.poll() is not None:
+            process = self._process = Popen(["docker", "run", "-i", "--rm",
+            self._image, "python", "run_solver.py", "--serve"], stdin=PIPE,
+            stdout=PIPE)
+            os.set_blocking(process.stdin.fileno(), False)
+        try:
+            self._write(frame_strings(problems), deadline)
+            count, = struct.unpack(">I", self._read(4, deadline))
+            results = []
+            for _ in range(count):
+                size, = struct.unpack(">I", self._read(4, deadline))
+                results.append(self._read(size, deadline).decode())
+            return results
+        except:
+            self.close()
+            raise
+
+    def close(self):
+        """ Stop the container, if it is running """
+        process, self._process = getattr(self, "_process", None), None
+        if process is not None and process.poll() is None:
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+            process.terminate()
+            process.wait()
+            process.stdout.close()
+
+    def _write(self, parts: Sequence[bytes], deadline: float):
+        """ Write the given parts to the stdin of the container, waiting at
+            most until the given deadline. The stdin file descriptor is
+            non-blocking, such that a container that stops reading cannot block
+            the write """
+        fd = self._process.stdin.fileno()
+        for part in parts:
+            view = memoryview(part)
+            while view:
+                _, ready, _ = select([], [fd], [], max(0.0, deadline -
+                monotonic()))
+                if not ready:
+                    raise TimeoutExpired(self._process.args, self._timeout)
+                try:
+                    view = view[os.write(fd, view):]
+                except BlockingIOError:
+                    pass
+
+    def _read(self, size: int, deadline: float) -> bytes:
+        """ Read the given number of bytes from the stdout of the container,
+            waiting at most until the given deadline. The stdout file descriptor
+            is read directly, such that no data is hidden in a buffer """
+        fd = self._process.stdout.fileno()
+        data = bytearray()
+        while len(data) < size:
+            ready, _, _ = select([fd], [], [], max(0.0, deadline - monotonic()))
+            if not ready:
+                raise TimeoutExpired(self._process.args, self._timeout)
+            chunk = os.read(fd, size - len(data))
+            if not chunk:
+                raise RuntimeError(f"Container of {self._image} exited "
+                "unexpectedly")
+            data += chunk
+        return bytes(data)
@@ -1,16 +1,18 @@
 
-import docker
-from docker.errors import ImageNotFound
 from typing import Iterator
 from .model_counter import ModelCounter, ModelCounterResult
 from ..cnf import CNF
 from ..weights import WeightFunction
-from .formats import format_dpmc
-from subprocess import Popen, PIPE
-import json
+from .formats import format_dpmc_bytes
+from .container import SolverContainer, image_available
 from .config import RUNNER_VERSION
+import re
 
 PROCESS_TIMEOUT = 30
+# Lines of the solver output with the model count or the runtime, which is the
+# last field of the line
+RESULT_PATTERN = re.compile(r"^(c s exact double prec-sci|c seconds).*?(\S+)"
+r"[^\S\n]*$", re.M)
 
 class DPMC(ModelCounter):
     """ Interface to the DPMC model counter, which requires a docker image
@@ -18,7 +20,9 @@ class DPMC(ModelCounter):
 
     def __init__(self):
         """ Constructor """
-        self._client = docker.from_env()
+        # Long-running container that solves the batches of problems
+        self._container = SolverContainer(f"dpmc:{RUNNER_VERSION}",
+        PROCESS_TIMEOUT)
 
     def model_count(self, cnf: CNF, weight_func: WeightFunction) -> (
     ModelCounterResult):
@@ -29,32 +33,28 @@ class DPMC(ModelCounter):
     def batch_model_count(self, *problems: tuple[CNF, WeightFunction]) -> (
     Iterator[ModelCounterResult]):
         try:
-            problem_strings = [format_dpmc(cnf, wf) for cnf, wf in problems]
-            problems_json = json.dumps({"problems": problem_strings})
-            process = Popen(["docker", "run", "-i", "--rm",
-            f"dpmc:{RUNNER_VERSION}", "python", "run_solver.py"], stdin=PIPE,
-            stdout=PIPE)
-            output, _ = process.communicate(input=problems_json.encode(),
-            timeout=PROCESS_TIMEOUT)
+            results = self._container.solve([format_dpmc_bytes(cnf, wf) for
+            cnf, wf in problems])
         except:
             for _ in problems:
                 yield ModelCounterResult(False)
-        results = json.loads(output.decode())
-        for result in results["results"]:
+            return
+        for result in results:
             model_count = None
             runtime = -1.0
-            for line in result.split("\n"):
-                if line.startswith("c s exact double prec-sci"):
-                    model_count = float(line.split()[-1])
-                if line.startswith("c seconds"):
-                    runtime = float(line.split()[-1])
+            for match in RESULT_PATTERN.finditer(result):
+                if match[1] == "c seconds":
+                    runtime = float(match[2])
+                else:
+                    model_count = float(match[2])
             yield ModelCounterResult(model_count is not None, runtime,
             model_count)
 
+    def close(self):
+        """ Stop the long-running container, if it is running. A new container
+            is started when problems are solved again """
+        self._container.close()
+
     def is_available(self) -> bool:
         """ Returns if DPMC is available """
-        try:
-            self._client.images.get("dpmc:latest")
-        except ImageNotFound:
-            return False
-        return True
\ No newline at end of file
+        return image_available(f"dpmc:{RUNNER_VERSION}")
\ No newline at end of file
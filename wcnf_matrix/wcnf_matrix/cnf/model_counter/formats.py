@@ -6,44 +6,35 @@ from ..boolvar import BoolVar
 def format_dpmc(cnf: CNF, weight_func: WeightFunction) -> str:
     """ Convert the given weighted CNF formula to the DPMC input format and
         return it as a string """
+    return format_dpmc_bytes(cnf, weight_func).decode()
+
+def format_dpmc_bytes(cnf: CNF, weight_func: WeightFunction) -> bytes:
+    """ Convert the given weighted CNF formula to the DPMC input format and
+        return it as ASCII encoded bytes, which can be sent to the solver
+        directly """
     text: list[str] = []
-    var_index: dict[BoolVar, int] = {}
-    var: list[BoolVar] = []
-    for i, v in enumerate(weight_func.domain):
-        var_index[v] = i
-        var.append(v)
-    text.append(f"p cnf {len(var_index)} {cnf.num_clauses}")
-    vars_string = "".join(str(i) + " " for i in range(1, len(var_index) + 1))
-    text.append(f"c p show {vars_string}0")
-    for i in range(1, len(var_index) + 1):
-        text.append(f"c p weight {i} {weight_func[var[i - 1], True]}")
-        text.append(f"c p weight {-i} {weight_func[var[i - 1], False]}")
-    for clause in cnf.clauses:
-        cur = ""
-        for v in clause:
-            if not v.value:
-                cur += "-"
-            cur += str(var_index[v.var] + 1) + " "
-        text.append(cur + "0")
-    return "\n".join(text)
+    var: list[BoolVar] = list(weight_func.domain)
+    text.append(f"p cnf {len(var)} {cnf.num_clauses}")
+    text.append(" ".join(["c p show", *map(str, range(1, len(var) + 1)), "0"]))
+    neg_weights, pos_weights = weight_func.get_weights(var)
+    text.extend(f"c p weight {i} {pos}\nc p weight {-i} {neg}" for i, (pos,
+    neg) in enumerate(zip(pos_weights, neg_weights), 1))
+    if cnf.num_clauses > 0:
+        text.append(cnf.dimacs_clauses(var))
+    return "\n".join(text).encode()
 
 def format_cachet(cnf: CNF, weight_func: WeightFunction) -> str:
     """ Convert this object to a Cachet formatted string. Assumes that
         weight[v] + weight[-v] = 1 for all variables v in the domain of
         weight_func """
     text: list[str] = []
-    var_index: dict[BoolVar, int] = {}
-    var: list[BoolVar] = []
-    for i, v in enumerate(weight_func.domain):
-        var_index[v] = i
-        var.append(v)
+    var: list[BoolVar] = list(weight_func.domain)
     # CNF description
-    text.append(f"p cnf {len(var_index)} {cnf.num_clauses}")
+    text.append(f"p cnf {len(var)} {cnf.num_clauses}")
     # Variable weights
-    for i in range(1, len(var_index) + 1):
-        text.append(f"w {i} {weight_func[var[i - 1], True]}")
+    _, pos_weights = weight_func.get_weights(var)
+    text.extend(f"w {i} {pos}" for i, pos in enumerate(pos_weights, 1))
     # Clauses
-    for clause in cnf.clauses:
-        text.append("".join(map(lambda v: ("-" if not v.value else "") +
-        str(var_index[v.var] + 1) + " ", clause)) + "0")
+    if cnf.num_clauses > 0:
+        text.append(cnf.dimacs_clauses(var))
     return "\n".join(text)
\ No newline at end of file
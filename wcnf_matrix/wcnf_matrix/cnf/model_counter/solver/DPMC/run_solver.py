@@ -1,36 +1,134 @@
 
-from subprocess import PIPE, Popen, TimeoutExpired
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from select import select
+from subprocess import PIPE, Popen
 from tempfile import NamedTemporaryFile
+from time import monotonic
+from typing import BinaryIO, Iterator
+import os
 import sys
 import json
+import struct
 
 TIMEOUT = 15
 SRC_FOLDER = "/usr/src/app/DPMC"
+# Directory of temporary input files if anonymous memory files are not
+# supported, which is memory-backed when available
+TEMP_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+# Prefixes of the output lines of dmc with the model count and the runtime.
+# Once all have been printed the solver is stopped, since the rest of the run is
+# only teardown
+RESULT_PREFIXES = (b"c s exact double prec-sci", b"c seconds")
 
-inputs: list[str] = json.loads(sys.stdin.read())["problems"]
+@contextmanager
+def input_file(inp: str) -> Iterator[tuple[BinaryIO, str]]:
+    """ Context in which the given input is stored in a file. Gives the file,
+        positioned at the start, and a path through which a subprocess that
+        inherits the file descriptor can open the file. The file is kept in
+        memory without a name on disk if possible """
+    try:
+        file = open(os.memfd_create("dpmc-input"), "w+b")
+        path = f"/proc/self/fd/{file.fileno()}"
+    except (AttributeError, OSError):
+        file = NamedTemporaryFile(dir=TEMP_DIR)
+        path = file.name
+    with file:
+        file.write(inp.encode())
+        file.flush()
+        file.seek(0)
+        yield file, path
 
 def run_on_input(inp: str) -> str | None:
     """ Run the solver on the given input and return result string, or None if
         the operation failed """
-    temp_file = NamedTemporaryFile()
-    with open(temp_file.name, "w") as f:
-        f.write(inp)
-    infile = open(temp_file.name, "r")
-    p1 = Popen(["./lg/build/lg", "./lg/solvers/flow-cutter-pace17/"
-    "flow_cutter_pace17 -p 100"], cwd=SRC_FOLDER, stdout=PIPE, stdin=infile)
-    p2 = Popen(["./dmc/dmc", f"--cf={temp_file.name}"], cwd=SRC_FOLDER, stdout=PIPE,
-    stdin=p1.stdout)
-    try:
-        output, _ = p2.communicate(timeout=TIMEOUT)
-    except TimeoutExpired:
+    with input_file(inp) as (file, path):
+        p1 = Popen(["./lg/build/lg", "./lg/solvers/flow-cutter-pace17/"
+        "flow_cutter_pace17 -p 100"], cwd=SRC_FOLDER, stdout=PIPE, stdin=file)
+        p2 = Popen(["./dmc/dmc", f"--cf={path}"], cwd=SRC_FOLDER, stdout=PIPE,
+        stdin=p1.stdout, pass_fds=(file.fileno(),))
+        p1.stdout.close()
+        output = read_output(p2, monotonic() + TIMEOUT)
+        # Stop the pipeline if it is still running, such that it does not take
+        # up a CPU that other inputs are solved on
+        for p in (p1, p2):
+            if p.poll() is None:
+                p.kill()
+            p.wait()
+        p2.stdout.close()
+    return None if output is None else output.decode("utf-8")
+
+def read_output(process: Popen, deadline: float) -> bytes | None:
+    """ Read the output of the given dmc process until the lines starting with
+        RESULT_PREFIXES have been printed or the process exits. Returns None if
+        this takes until after the deadline """
+    fd = process.stdout.fileno()
+    output = bytearray()
+    # Number of bytes of the output of which all lines have been checked
+    checked = 0
+    missing = set(RESULT_PREFIXES)
+    while missing:
+        ready, _, _ = select([fd], [], [], max(0.0, deadline - monotonic()))
+        if not ready:
+            return None
+        chunk = os.read(fd, 1 << 16)
+        if not chunk:
+            break
+        output += chunk
+        end = output.rfind(b"\n") + 1
+        for line in output[checked:end].splitlines():
+            missing = {prefix for prefix in missing if not
+            line.startswith(prefix)}
+        checked = max(checked, end)
+    return bytes(output)
+
+def run_on_inputs(inputs: list[str]) -> dict[str, list[str]]:
+    """ Run the solver on all given inputs and return an object with the inputs
+        and result strings, which are "ERR" if the operation failed. Inputs are
+        solved in parallel, each with its own timeout """
+    results = {"results": [], "inputs": inputs}
+    # The solvers run in subprocesses, so threads suffice to run them in
+    # parallel
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        outputs = list(executor.map(run_on_input, inputs))
+    for result in outputs:
+        if result is None:
+            results["results"].append("ERR")
+        else:
+            results["results"].append(result)
+    return results
+
+def read_strings() -> list[str] | None:
+    """ Read a list of strings from stdin, sent as the number of strings
+        followed by every UTF-8 encoded string prefixed with its length, where
+        all integers are 4-byte big-endian. Returns None at the end of stdin """
+    header = sys.stdin.buffer.read(4)
+    if len(header) < 4:
         return None
-    return output.decode("utf-8")
-
-results = {"results": [], "inputs": inputs}
-for inp in inputs:
-    result = run_on_input(inp)
-    if result is None:
-        results["results"].append("ERR")
-    else:
-        results["results"].append(result)
-print(json.dumps(results))
\ No newline at end of file
+    strings = []
+    for _ in range(struct.unpack(">I", header)[0]):
+        size, = struct.unpack(">I", sys.stdin.buffer.read(4))
+        strings.append(sys.stdin.buffer.read(size).decode())
+    return strings
+
+def write_strings(strings: list[str]):
+    """ Write a list of strings to stdout, in the format read by read_strings()
+        """
+    frame = [struct.pack(">I", len(strings))]
+    for string in strings:
+        data = string.encode()
+        frame += (struct.pack(">I", len(data)), data)
+    sys.stdout.buffer.write(b"".join(frame))
+    sys.stdout.buffer.flush()
+
+def serve():
+    """ Keep solving batches of problems sent over stdin, such that the
+        container can be reused. Batches and results are sent in the format of
+        read_strings() """
+    while (inputs := read_strings()) is not None:
+        write_strings(run_on_inputs(inputs)["results"])
+
+if "--serve" in sys.argv:
+    serve()
+else:
+    print(json.dumps(run_on_inputs(json.loads(sys.stdin.read())["problems"])))
\ No newline at end of file
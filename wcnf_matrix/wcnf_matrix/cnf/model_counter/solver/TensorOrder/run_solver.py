@@ -3,12 +3,11 @@ from subprocess import PIPE, Popen, TimeoutExpired
 from tempfile import NamedTemporaryFile
 import sys
 import json
+import struct
 
 TIMEOUT = 15
 SRC_FOLDER = "/usr/src/app/TensorOrder"
 
-inputs: "list[str]" = json.loads(sys.stdin.read())["problems"]
-
 def run_on_input(inp: str) -> "str | None":
     """ Run the solver on the given input and return result string, or None if
         the operation failed """
@@ -25,11 +24,52 @@ def run_on_input(inp: str) -> "str | None":
         return None
     return output.decode("utf-8")
 
-results = {"results": [], "inputs": inputs}
-for inp in inputs:
-    result = run_on_input(inp)
-    if result is None:
-        results["results"].append("ERR")
-    else:
-        results["results"].append(result)
-print(json.dumps(results))
\ No newline at end of file
+def run_on_inputs(inputs: "list[str]") -> "dict[str, list[str]]":
+    """ Run the solver on all given inputs and return an object with the inputs
+        and result strings, which are "ERR" if the operation failed """
+    results = {"results": [], "inputs": inputs}
+    for inp in inputs:
+        result = run_on_input(inp)
+        if result is None:
+            results["results"].append("ERR")
+        else:
+            results["results"].append(result)
+    return results
+
+def read_strings() -> "list[str] | None":
+    """ Read a list of strings from stdin, sent as the number of strings
+        followed by every UTF-8 encoded string prefixed with its length, where
+        all integers are 4-byte big-endian. Returns None at the end of stdin """
+    header = sys.stdin.buffer.read(4)
+    if len(header) < 4:
+        return None
+    strings = []
+    for _ in range(struct.unpack(">I", header)[0]):
+        size, = struct.unpack(">I", sys.stdin.buffer.read(4))
+        strings.append(sys.stdin.buffer.read(size).decode())
+    return strings
+
+def write_strings(strings: "list[str]"):
+    """ Write a list of strings to stdout, in the format read by read_strings()
+        """
+    frame = [struct.pack(">I", len(strings))]
+    for string in strings:
+        data = string.encode()
+        frame += (struct.pack(">I", len(data)), data)
+    sys.stdout.buffer.write(b"".join(frame))
+    sys.stdout.buffer.flush()
+
+def serve():
+    """ Keep solving batches of problems sent over stdin, such that the
+        container can be reused. Batches and results are sent in the format of
+        read_strings() """
+    while True:
+        inputs = read_strings()
+        if inputs is None:
+            break
+        write_strings(run_on_inputs(inputs)["results"])
+
+if "--serve" in sys.argv:
+    serve()
+else:
+    print(json.dumps(run_on_inputs(json.loads(sys.stdin.read())["problems"])))
\ No newline at end of file
@@ -4,15 +4,14 @@ from tempfile import NamedTemporaryFile
 import sys
 from time import time
 import json
+import struct
 
 TIMEOUT = 15
 SRC_FOLDER = "/usr/src/app/cachet"
 
-inputs: list[str] = json.loads(sys.stdin.read())["problems"]
-
-def run_on_input(inp: str) -> str | None:
-    """ Run the solver on the given input and return result string, or None if
-        the operation failed """
+def run_on_input(inp: str) -> tuple[float, float] | None:
+    """ Run the solver on the given input and return the satisfying probability
+        and the runtime, or None if the operation failed """
     temp_file = NamedTemporaryFile()
     with open(temp_file.name, "w") as f:
         f.write(inp)
@@ -23,13 +22,53 @@ def run_on_input(inp: str) -> str | None:
         end = time()
     except TimeoutExpired:
         return None
-    return output.decode("utf-8") + "\nRUNTIME: " + str(end - start)
-
-results = {"results": [], "inputs": inputs}
-for inp in inputs:
-    result = run_on_input(inp)
-    if result is None:
-        results["results"].append("ERR")
-    else:
-        results["results"].append(result)
-print(json.dumps(results))
\ No newline at end of file
+    for line in output.decode("utf-8").split("\n"):
+        if line.startswith("Satisfying probability"):
+            return float(line.split()[-1]), end - start
+    return None
+
+def run_on_inputs(inputs: list[str]) -> list[str]:
+    """ Run the solver on all given inputs and return one JSON object per
+        input, with the satisfying probability and the runtime. The
+        probability is null and the runtime is -1 if the operation failed """
+    results = []
+    for inp in inputs:
+        result = run_on_input(inp)
+        prob, runtime = (None, -1.0) if result is None else result
+        results.append(json.dumps({"prob": prob, "runtime": runtime}))
+    return results
+
+def read_strings() -> list[str] | None:
+    """ Read a list of strings from stdin, sent as the number of strings
+        followed by every UTF-8 encoded string prefixed with its length, where
+        all integers are 4-byte big-endian. Returns None at the end of stdin """
+    header = sys.stdin.buffer.read(4)
+    if len(header) < 4:
+        return None
+    strings = []
+    for _ in range(struct.unpack(">I", header)[0]):
+        size, = struct.unpack(">I", sys.stdin.buffer.read(4))
+        strings.append(sys.stdin.buffer.read(size).decode())
+    return strings
+
+def write_strings(strings: list[str]):
+    """ Write a list of strings to stdout, in the format read by read_strings()
+        """
+    frame = [struct.pack(">I", len(strings))]
+    for string in strings:
+        data = string.encode()
+        frame += (struct.pack(">I", len(data)), data)
+    sys.stdout.buffer.write(b"".join(frame))
+    sys.stdout.buffer.flush()
+
+def serve():
+    """ Keep solving batches of problems sent over stdin, such that the
+        container can be reused. Batches and results are sent in the format of
+        read_strings() """
+    while (inputs := read_strings()) is not None:
+        write_strings(run_on_inputs(inputs))
+
+if "--serve" in sys.argv:
+    serve()
+else:
+    print("\n".join(run_on_inputs(json.loads(sys.stdin.read())["problems"])))
@@ -1,16 +1,18 @@
 
-import docker
-from docker.errors import NotFound
 from typing import Iterator
 from .model_counter import ModelCounter, ModelCounterResult
 from ..cnf import CNF
 from ..weights import WeightFunction
 from .formats import format_cachet
-import json
+from .container import SolverContainer, image_available
 from .config import RUNNER_VERSION
-from subprocess import Popen, PIPE
+import re
 
 PROCESS_TIMEOUT = 30
+# Lines of the solver output with the model count or the runtime, which is the
+# last field of the line
+RESULT_PATTERN = re.compile(r"^(Count:|Total Time:).*?(\S+)[^\S\n]*$",
+re.M)
 
 class TensorOrder(ModelCounter):
     """ Interface to the TensorOrder model counter, which requires a docker
@@ -18,7 +20,9 @@ class TensorOrder(ModelCounter):
 
     def __init__(self):
         """ Constructor """
-        self._client = docker.from_env()
+        # Long-running container that solves the batches of problems
+        self._container = SolverContainer(f"tensororder:{RUNNER_VERSION}",
+        PROCESS_TIMEOUT)
 
     def model_count(self, cnf: CNF, weight_func: WeightFunction) -> (
     ModelCounterResult):
@@ -32,34 +36,30 @@ class TensorOrder(ModelCounter):
         problems, factors = self._normalize_problems(*problems)
         try:
             problem_strings = [format_cachet(cnf, wf) for cnf, wf in problems]
-            problems_json = json.dumps({"problems": problem_strings})
-            process = Popen(["docker", "run", "-i", "--rm",
-            f"tensororder:{RUNNER_VERSION}", "python", "run_solver.py"],
-            stdin=PIPE, stdout=PIPE)
-            output, _ = process.communicate(input=problems_json.encode(),
-            timeout=PROCESS_TIMEOUT)
+            results = self._container.solve(problem_strings)
         except:
             for _ in problems:
                 yield ModelCounterResult(False)
-        results = json.loads(output.decode())
-        for result, factor in zip(results["results"], factors):
+            return
+        for result, factor in zip(results, factors):
             model_count = None
             runtime = -1.0
-            for line in result.split("\n"):
-                if line.startswith("Count:"):
-                    model_count = float(line.split()[-1]) * factor
-                if line.startswith("Total Time:"):
-                    runtime = float(line.split()[-1])
+            for match in RESULT_PATTERN.finditer(result):
+                if match[1] == "Total Time:":
+                    runtime = float(match[2])
+                else:
+                    model_count = float(match[2]) * factor
             yield ModelCounterResult(model_count is not None, runtime,
             model_count)
 
+    def close(self):
+        """ Stop the long-running container, if it is running. A new container
+            is started when problems are solved again """
+        self._container.close()
+
     def is_available(self) -> bool:
-        """ Returns if Cachet is available """
-        try:
-            self._client.images.get("tensororder:latest")
-        except NotFound:
-            return False
-        return True
+        """ Returns if TensorOrder is available """
+        return image_available(f"tensororder:{RUNNER_VERSION}")
     
     def _normalize_problems(self, *problems: tuple[CNF, WeightFunction]) -> (
     tuple[list[tuple[CNF, WeightFunction]], list[float]]):
@@ -171,6 +171,15 @@ class WeightFunction:
             raise KeyError(f"Variable {var} not in domain of weight function")
         return self._weights[var][value]
     
+    def get_weights(self, variables: Iterable[BoolVar]) -> tuple[list[float |
+    None], list[float | None]]:
+        """ Get the negative and positive weights of the given variables, as a
+            list of negative weights and a list of positive weights in the order
+            of the variables. Throw a KeyError if a variable is not in the
+            domain """
+        weights = [self._weights[var] for var in variables]
+        return [neg for neg, _ in weights], [pos for _, pos in weights]
+
     def set_weight(self, var: BoolVar, value: bool, weight: float | None):
         """ Set the weight of the given variable with the given value. Throw a
             KeyError if the variable is not in the domain """
@@ -6,6 +6,8 @@ class Index[Field]:
     """ Represents a Hilbert space for a q-state system, over some field given
         by a type of values """
 
+    __slots__ = ("q", "field", "zero", "one", "_basis")
+
     def __init__(self, q: int = 2, field: type[Field] = float):
         """ Constructor of a Hilbert space for a q-state system with the given
             field type """
@@ -13,6 +15,11 @@ class Index[Field]:
         if self.q < 2:
             raise ValueError(f"Hilbert space cannot have q = {self.q} states")
         self.field = field
+        # Constants of the field, which are used to construct matrices
+        self.zero, self.one = field(0), field(1)
+        # Basis elements are shared, such that they are not created on every
+        # lookup
+        self._basis = tuple(IndexBasisElement(self, i) for i in range(q))
 
     def __str__(self) -> str:
         """ String representation of the index for debugging """
@@ -20,13 +27,18 @@ class Index[Field]:
 
     def __getitem__(self, value: int) -> IndexBasisElement[Field]:
         """ Get one of the basis elements of this Hilbert space """
-        return IndexBasisElement(self, value)
+        if not 0 <= value < self.q:
+            raise ValueError(f"Element |{value}> is not in the standard basis "
+            f"of a {self.q}-state Hilbert space")
+        return self._basis[value]
 
 
 
 class IndexBasisElement[Field]:
     """ A basis element in some Hilbert space, which can be |0>, ..., |q-1> """
 
+    __slots__ = ("index", "value")
+
     def __init__(self, index: Index[Field], value: int):
         """ Constructor given the index (Hilbert space of the basis element) and
             the element, which can be 0, ..., q-1 """
@@ -43,10 +55,17 @@ class IndexBasisElement[Field]:
     def __eq__(self, other: Any) -> bool:
         """ Two basis elements are equal if their indices and values are the
             same """
+        if self is other:
+            return True
         if not isinstance(other, IndexBasisElement):
             return False
         return self.index == other.index and self.value == other.value
 
+    def __hash__(self) -> int:
+        """ Hash consistent with equality, based on the identity of the index
+            and the value """
+        return hash((id(self.index), self.value))
+
     @property
     def field(self) -> type[Field]:
         """ The field of the Hilbert space this element is in """
@@ -54,4 +73,4 @@ class IndexBasisElement[Field]:
 
 def uset[Field](index: Index[Field]) -> Iterator[IndexBasisElement[Field]]:
     """ Get the set of basis elements of the given index """
-    return (index[i] for i in range(index.q))
\ No newline at end of file
+    return iter(index._basis)
\ No newline at end of file
@@ -12,6 +12,8 @@ if TYPE_CHECKING:
 class AbstractMatrix[Field](ABC):
     """ Abstract definition of a matrix, with operations for creating bras and
         kets, addition, multiplication, etc. """
+
+    __slots__ = ("_index",)
     
     def __init__(self, index: Index[Field]):
         """ Constructor with the Hilbert space the matrix operates on """
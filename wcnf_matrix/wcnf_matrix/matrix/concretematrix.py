@@ -1,90 +1,149 @@
 
 from __future__ import annotations
-from typing import Iterable, Any, Self
+from typing import Iterable, Any, Self, Callable, Sequence
 from itertools import product
-from functools import reduce
+import numpy as np
 from ..index import Index, IndexBasisElement
 from .abstractmatrix import AbstractMatrix
 
+def _dtype_from_field(field: type) -> np.dtype:
+    """ Get the NumPy data type used to store the values of the given field.
+        Fields without a native NumPy type are stored as Python objects """
+    return np.dtype({float: np.float64, complex: np.complex128}.get(field,
+    object))
+
+def _basis_position(elements: Iterable[IndexBasisElement]) -> int:
+    """ Get the position of the one-hot entry of the bra or ket of the given
+        basis elements, where the first element is the most significant digit
+        in base q """
+    position = 0
+    for elt in elements:
+        position = position * elt.index.q + elt.value
+    return position
+
+def _tree_reduce[T](op: Callable[[T, T], T], elements: Sequence[T]) -> T:
+    """ Reduce a non-empty sequence with an associative operation by combining
+        neighbouring pairs, such that intermediate results stay balanced in
+        size, instead of folding from the left """
+    elements = list(elements)
+    while len(elements) > 1:
+        pairs = [op(x, y) for x, y in zip(elements[::2], elements[1::2])]
+        elements = pairs + elements[2 * len(pairs):]
+    return elements[0]
+
+def _chain_splits(dims: Sequence[int]) -> list[list[int]]:
+    """ Find the order in which a chain of matrices is multiplied with the
+        fewest scalar multiplications, given the dimensions, where matrix i has
+        shape (dims[i], dims[i + 1]). Entry [i][j] of the output is the position
+        k at which the product of matrices i, ..., j is split into i, ..., k and
+        k + 1, ..., j """
+    n = len(dims) - 1
+    cost = [[0] * n for _ in range(n)]
+    splits = [[0] * n for _ in range(n)]
+    for length in range(2, n + 1):
+        for i in range(n - length + 1):
+            j = i + length - 1
+            cost[i][j], splits[i][j] = min((cost[i][k] + cost[k + 1][j] +
+            dims[i] * dims[k + 1] * dims[j + 1], k) for k in range(i, j))
+    return splits
+
 class ConcreteMatrix[Field](AbstractMatrix[Field]):
-    """ Basic matrix implementation using 2D lists """
+    """ Basic matrix implementation using a 2D NumPy array """
+
+    __slots__ = ("_values", "_shape")
 
     def __init__(self, index: Index[Field], values: Iterable[Iterable[Field]]):
-        """ Initialize matrix using iterator over rows """
+        """ Initialize matrix using iterator over rows. The values are copied
+            """
         super().__init__(index)
-        self._values = list(list(row) for row in values)
+        if not isinstance(values, np.ndarray):
+            values = [list(row) for row in values]
+        self._values = np.array(values, dtype=_dtype_from_field(index.field))
+        self._shape: tuple[int, int] = self._values.shape
 
     def __str__(self) -> str:
         """ String representation of the matrix """
-        entries = [[str(cell) for cell in row] for row in self._values]
+        entries = [[str(cell) for cell in row] for row in
+        self._values.tolist()]
         max_len = max(max(len(cell) for cell in row) for row in entries)
         return "[ " + "\n  ".join("  ".join(cell.rjust(max_len) for cell in row)
         for row in entries) + " ]"
 
     def __eq__(self, other: Any) -> bool:
+        if self is other:
+            return True
         if not isinstance(other, self.__class__):
             return False
-        if self._index != other._index:
+        if self._index is not other._index:
             return False
         if self.shape != other.shape:
             return False
-        return all(all(a == b for a, b in zip(row_a, row_b)) for row_a, row_b in
-        zip(self._values, other._values))
+        return bool(np.array_equal(self._values, other._values))
+
+    def __add__(self, other: ConcreteMatrix[Field]) -> ConcreteMatrix[Field]:
+        """ Add two matrices together and return the result """
+        self._check_compatible(other)
+        return self._from_array(self._index, self._values + other._values)
+
+    def __sub__(self, other: ConcreteMatrix[Field]) -> ConcreteMatrix[Field]:
+        """ Subtract one matrix from another and return the result """
+        self._check_compatible(other)
+        return self._from_array(self._index, self._values - other._values)
 
     def __getitem__(self, key: tuple[int, int]) -> Field:
-        """ Get an entry from the matrix given by (row, column) """
-        return self._values[key[0]][key[1]]
+        """ Get an entry from the matrix given by (row, column). Entries are
+            returned as Python scalars, not as NumPy scalars """
+        return self._values.item(key[0], key[1])
     
     def __setitem__(self, key: tuple[int, int], value: Field):
         """ Set an entry in the matrix at position (row, column) to the given
             value """
-        self._values[key[0]][key[1]] = value
+        self._values[key[0], key[1]] = value
 
     @classmethod
     def zeros[Field](cls, index: Index[Field], shape: tuple[int, int]) -> (
     ConcreteMatrix[Field]):
         """ Get a concrete matrix with the given dimensions, filled with zeros
             """
-        return ConcreteMatrix(index, ((0 for _ in range(shape[1])) for _ in
-        range(shape[0])))
+        return cls._from_array(index, np.full(shape, index.zero,
+        dtype=_dtype_from_field(index.field)))
 
     @classmethod
     def bra[Field](cls, *elements: IndexBasisElement[Field]) -> ConcreteMatrix[
     Field]:
         if len(elements) == 0:
             raise ValueError("Cannot construct bra from zero basis elements")
-        if not all(elt.index == elements[0].index for elt in elements):
+        if len({elt.index for elt in elements}) > 1:
             raise ValueError("Cannot construct bra from basis elements from "
             "different fields")
         q, index = elements[0].index.q, elements[0].index
-        zero, one = elements[0].index.field(0), elements[0].index.field(1)
-        true_index = sum(elt.value * q ** i for i, elt in enumerate(
-        reversed(elements)))
-        return ConcreteMatrix(index, [[one if i == true_index else zero for i in
-        range(q ** len(elements))]])
+        one = index.one
+        true_index = _basis_position(elements)
+        out = cls.zeros(index, (1, q ** len(elements)))
+        out[0, true_index] = one
+        return out
 
     @classmethod
     def ket[Field](cls, *elements: IndexBasisElement[Field]) -> ConcreteMatrix[
     Field]:
         if len(elements) == 0:
             raise ValueError("Cannot construct ket from zero basis elements")
-        if not all(elt.index == elements[0].index for elt in elements):
+        if len({elt.index for elt in elements}) > 1:
             raise ValueError("Cannot construct ket from basis elements from "
             "different fields")
         q, index = elements[0].index.q, elements[0].index
-        zero, one = elements[0].index.field(0), elements[0].index.field(1)
-        true_index = sum(elt.value * q ** i for i, elt in enumerate(
-        reversed(elements)))
-        return ConcreteMatrix(index, [[one if i == true_index else zero] for i
-        in range(q ** len(elements))])
+        one = index.one
+        true_index = _basis_position(elements)
+        out = cls.zeros(index, (q ** len(elements), 1))
+        out[true_index, 0] = one
+        return out
     
     @classmethod
     def identity[Field](cls, index: Index[Field], size: int) -> ConcreteMatrix[
     Field]:
-        zero, one = index.field(0), index.field(1)
-        q = index.q
-        return ConcreteMatrix(index, [[one if i == j else zero for j in
-        range(q ** size)] for i in range(q ** size)])
+        out = cls.zeros(index, (index.q ** size, index.q ** size))
+        np.fill_diagonal(out._values, index.one)
+        return out
 
     @classmethod
     def linear_comb[Field](cls, *elements: tuple[Field, ConcreteMatrix[Field]] |
@@ -92,26 +151,29 @@ class ConcreteMatrix[Field](AbstractMatrix[Field]):
         if len(elements) == 0:
             raise ValueError("Cannot determine linear combination of zero "
             "matrices")
-        if isinstance(elements[0], ConcreteMatrix):
-            one = elements[0]._index.field(1)
-        else:
-            one = elements[0][1]._index.field(1)
-        elements = tuple(elt if isinstance(elt, tuple) else (one, elt) for elt
-        in elements)
-        if not all(elt[1].shape == elements[0][1].shape for elt in elements):
-            raise ValueError("Not all matrices in linear combination have the "
-            "same shape")
-        if not all(elt[1]._index == elements[0][1]._index for elt in elements):
-            raise ValueError("Cannot calculate linear combination of matrices "
-            "with different index")
-        index = elements[0][1]._index
-        zero = elements[0][1]._index.field(0)
-        shape = elements[0][1].shape
-        values = [[zero for _ in range(shape[1])] for _ in range(shape[0])]
-        for factor, elt in elements:
-            for i, j in product(range(shape[0]), range(shape[1])):
-                values[i][j] += factor * elt._values[i][j]
-        return ConcreteMatrix(index, values)
+        first = elements[0][1] if isinstance(elements[0], tuple) else (
+        elements[0])
+        index, one = first._index, first._index.one
+        # Normalize and validate the terms in a single pass
+        terms: list[tuple[Field, ConcreteMatrix[Field]]] = []
+        for elt in elements:
+            factor, matrix = elt if isinstance(elt, tuple) else (one, elt)
+            first._check_compatible(matrix)
+            terms.append((factor, matrix))
+        # Accumulate in place, using a single buffer for the scaled terms. The
+        # data type is promoted if needed, e.g. for complex factors of a real
+        # matrix
+        dtype = np.result_type(*(elt._values for _, elt in terms),
+        *(np.asarray(factor) for factor, _ in terms))
+        values = np.empty(first.shape, dtype=dtype)
+        np.multiply(first._values, terms[0][0], out=values)
+        buffer = np.empty_like(values) if len(terms) > 1 else None
+        for factor, elt in terms[1:]:
+            if factor == one:
+                values += elt._values
+            else:
+                values += np.multiply(elt._values, factor, out=buffer)
+        return cls._from_array(index, values)
 
     @classmethod
     def product[Field](cls, *elements: ConcreteMatrix[Field]) -> ConcreteMatrix[
@@ -119,7 +181,16 @@ class ConcreteMatrix[Field](AbstractMatrix[Field]):
         if not all(elt._index == elements[0]._index for elt in elements):
             raise ValueError("Cannot calculate product of matrices with "
             "different index")
-        return reduce(cls._multiply_matrices, elements)
+        if len(elements) <= 2:
+            return _tree_reduce(cls._multiply_matrices, elements)
+        splits = _chain_splits([elt.shape[0] for elt in elements] +
+        [elements[-1].shape[1]])
+        def multiply(i: int, j: int) -> ConcreteMatrix[Field]:
+            if i == j:
+                return elements[i]
+            k = splits[i][j]
+            return cls._multiply_matrices(multiply(i, k), multiply(k + 1, j))
+        return multiply(0, len(elements) - 1)
 
     @classmethod
     def kron[Field](cls, *elements: ConcreteMatrix[Field]) -> ConcreteMatrix[
@@ -127,11 +198,11 @@ class ConcreteMatrix[Field](AbstractMatrix[Field]):
         if not all(elt._index == elements[0]._index for elt in elements):
             raise ValueError("Cannot calculate product of matrices with "
             "different index")
-        return reduce(cls._kron_matrices, elements)
+        return _tree_reduce(cls._kron_matrices, elements)
 
     @property
     def shape(self) -> tuple[int, int]:
-        return (len(self._values), len(self._values[0]))
+        return self._shape
     
     def copy(self) -> ConcreteMatrix[Field]:
         return ConcreteMatrix(self._index, self._values)
@@ -163,6 +234,28 @@ class ConcreteMatrix[Field](AbstractMatrix[Field]):
                 out[i, j] = self[ti, tj]
         return out
 
+    @classmethod
+    def _from_array[Field](cls, index: Index[Field], values: np.ndarray) -> (
+    ConcreteMatrix[Field]):
+        """ Create a matrix which uses the given array for its values, without
+            copying it. The array should have the data type of the index field
+            """
+        matrix = cls.__new__(cls)
+        AbstractMatrix.__init__(matrix, index)
+        matrix._values = values
+        matrix._shape = values.shape
+        return matrix
+
+    def _check_compatible(self, other: ConcreteMatrix[Field]):
+        """ Raise a ValueError if the other matrix cannot be added to this
+            matrix, because it has a different shape or index """
+        if other.shape != self.shape:
+            raise ValueError("Not all matrices in linear combination have the "
+            "same shape")
+        if other._index != self._index:
+            raise ValueError("Cannot calculate linear combination of matrices "
+            "with different index")
+
     def _permutation_index(self, indices: list[int], target_index: int, log_dim:
     int, q: int) -> tuple[int, int]:
         """ Given some permutation, get the source index and identity matrix
@@ -192,25 +285,14 @@ class ConcreteMatrix[Field](AbstractMatrix[Field]):
         if left.shape[1] != right.shape[0]:
             raise ValueError(f"Cannot multiply matrices with incompatible "
             f"shapes {left.shape} and {right.shape}")
-        zero = left._index.field(0)
-        values = [[zero for _ in range(right.shape[1])] for _ in range(
-        left.shape[0])]
-        for i, j in product(range(left.shape[0]), range(right.shape[1])):
-            for k in range(left.shape[1]):
-                values[i][j] += left._values[i][k] * right._values[k][j]
-        return ConcreteMatrix(left._index, values)
+        return cls._from_array(left._index, left._values @ right._values)
     
     @classmethod
     def _kron_matrices[Field](cls, left: ConcreteMatrix[Field], right:
     ConcreteMatrix[Field]) -> ConcreteMatrix[Field]:
         """ Compute the kronecker product of two matrices and return the result.
             Assumes matrices have the same index """
-        zero = left._index.field(0)
-        values = [[zero for _ in range(left.shape[1] * right.shape[1])] for _ in
-        range(left.shape[0] * right.shape[1])]
-        for left_i, right_i, left_j, right_j in product(range(left.shape[0]),
-        range(right.shape[0]), range(left.shape[0]), range(right.shape[1])):
-            values[left_i * right.shape[0] + right_i][left_j * right.shape[1] +
-            right_j] = left._values[left_i][left_j] * right._values[right_i][
-            right_j]
-        return ConcreteMatrix(left._index, values)
\ No newline at end of file
+        a, b = left._values, right._values
+        values = (a[:, None, :, None] * b[None, :, None, :]).reshape(
+        a.shape[0] * b.shape[0], a.shape[1] * b.shape[1])
+        return cls._from_array(left._index, values)